@@ -1,22 +1,33 @@
+import functools
+import hmac
 import os
 import datetime as dt
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, NamedTuple, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from backend.db import SessionLocal
+from backend.db import ASYNC_DB, AsyncSessionLocal, ReadSessionLocal, SessionLocal
+from backend.executors import BoundedExecutor
 from backend.models import User
 
 
 SECRET_KEY = os.environ.get("BUDGET_APP_SECRET", "dev_secret_change_me")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 12
+USER_CACHE_TTL_SECONDS = float(os.environ.get("BUDGET_APP_USER_CACHE_TTL", "300"))
+USER_CACHE_SIZE = int(os.environ.get("BUDGET_APP_USER_CACHE_SIZE", "4096"))
+HASH_WORKERS = int(os.environ.get("BUDGET_APP_HASH_WORKERS", "2"))
+HASH_QUEUE_LIMIT = int(os.environ.get("BUDGET_APP_HASH_QUEUE_LIMIT", "64"))
+# Shared secret for the /api/metrics endpoints; unset keeps them disabled.
+METRICS_TOKEN = os.environ.get("BUDGET_APP_METRICS_TOKEN", "")
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
 
@@ -28,45 +39,226 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def run_db(db: Any, fn: Callable[..., Any], *args: Any) -> Any:
+    """Call fn(session, *args) against whichever session get_read_session produced.
+
+    Sync sessions run in the threadpool, as a plain sync endpoint would; an
+    AsyncSession runs fn through run_sync on the event loop, so the same
+    query code serves both modes.
+    """
+    if isinstance(db, Session):
+        return await run_in_threadpool(fn, db, *args)
+    return await db.run_sync(fn, *args)
+
+
+# passlib and python-jose (via cryptography) are slow to import, so they load
+# on first use rather than at worker boot.
+@functools.lru_cache(maxsize=None)
+def _pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
+
+def _jose():
+    import jose
+    import jose.jwt
+
+    return jose
+
+
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return _pwd_context().verify(plain, hashed)
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
+
+
+class PasswordHasher(BoundedExecutor):
+    """Runs password hashing on its own small thread pool.
+
+    pbkdf2 is deliberately slow; keeping it off the shared threadpool means a
+    burst of logins queues here instead of starving every sync endpoint.
+    """
+
+    busy_detail = "Too many sign-in attempts, try again shortly"
+
+    def __init__(self, workers: int, queue_limit: int) -> None:
+        super().__init__(max(1, workers), queue_limit)
+
+    def _create_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+
+
+password_hasher = PasswordHasher(HASH_WORKERS, HASH_QUEUE_LIMIT)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await password_hasher.run(verify_password, plain, hashed)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run(hash_password, password)
+
+
+def require_metrics_token(x_metrics_token: Optional[str] = Header(None)) -> None:
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_metrics_token or not hmac.compare_digest(x_metrics_token, METRICS_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid metrics token")
 
 
 def create_access_token(user_id: int) -> str:
     expire = dt.datetime.utcnow() + dt.timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
     payload = {"sub": str(user_id), "exp": expire}
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
-
-
-def _get_or_create_guest_user(db: Session) -> User:
-    user = db.query(User).order_by(User.id.asc()).first()
-    if user:
-        return user
-    user = User(
-        email="guest@local",
-        username="guest",
-        password_hash=hash_password(os.urandom(16).hex()),
-    )
+    return _jose().jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+class AuthUser(NamedTuple):
+    id: int
+    email: str
+    username: Optional[str]
+
+
+class UserCache:
+    """TTL-bounded LRU of user id -> AuthUser, plus the memoized guest."""
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._guest: Optional[AuthUser] = None
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[AuthUser]:
+        with self._lock:
+            item = self._entries.get(user_id)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return item[1]
+
+    def put(self, user: AuthUser) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    @property
+    def guest(self) -> Optional[AuthUser]:
+        return self._guest
+
+    @guest.setter
+    def guest(self, user: Optional[AuthUser]) -> None:
+        if self.ttl > 0 or user is None:
+            self._guest = user
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+            self._guest = None
+
+
+user_cache = UserCache(USER_CACHE_TTL_SECONDS, USER_CACHE_SIZE)
+
+
+def invalidate_user(user_id: Optional[int] = None) -> None:
+    user_cache.invalidate(user_id)
+
+
+def _auth_user(user: User) -> AuthUser:
+    return AuthUser(id=user.id, email=user.email, username=user.username)
+
+
+def _find_guest_user(db: Session) -> Optional[AuthUser]:
+    if user_cache.guest is None:
+        user = db.query(User).order_by(User.id.asc()).first()
+        if user:
+            user_cache.guest = _auth_user(user)
+    return user_cache.guest
+
+
+def _create_guest_user(db: Session, password_hash: str) -> AuthUser:
+    user = User(email="guest@local", username="guest", password_hash=password_hash)
     db.add(user)
     db.commit()
     db.refresh(user)
-    return user
+    user_cache.guest = _auth_user(user)
+    return user_cache.guest
+
+
+def _get_or_create_guest_user(db: Session) -> AuthUser:
+    return _find_guest_user(db) or _create_guest_user(db, hash_password(os.urandom(16).hex()))
+
+
+def _token_subject(token: Optional[str]) -> Optional[int]:
+    if not token:
+        return None
+    jose = _jose()
+    try:
+        payload = jose.jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return int(payload.get("sub") or 0) or None
+    except (jose.JWTError, ValueError):
+        return None
+
+
+def _load_user(db: Session, user_id: int) -> Optional[AuthUser]:
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        return None
+    record = _auth_user(user)
+    user_cache.put(record)
+    return record
 
 
 def get_current_user(
     token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
-    if token:
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            user_id = int(payload.get("sub") or 0)
-            user = db.query(User).filter(User.id == user_id).first()
-            if user:
-                return user
-        except (JWTError, ValueError):
-            pass
+) -> AuthUser:
+    user_id = _token_subject(token)
+    if user_id:
+        record = user_cache.get(user_id) or _load_user(db, user_id)
+        if record:
+            return record
     return _get_or_create_guest_user(db)
+
+
+async def get_current_user_async(token: Optional[str] = Depends(oauth2_scheme), db=Depends(get_async_db)) -> AuthUser:
+    user_id = _token_subject(token)
+    if user_id:
+        record = user_cache.get(user_id) or await db.run_sync(_load_user, user_id)
+        if record:
+            return record
+    guest = user_cache.guest or await db.run_sync(_find_guest_user)
+    if guest:
+        return guest
+    # run_sync executes on the event loop, so hash on the password pool first.
+    password_hash = await hash_password_async(os.urandom(16).hex())
+    return await db.run_sync(_create_guest_user, password_hash)
+
+
+# Dependencies for endpoints that go through run_db and work in either mode.
+get_read_session = get_async_db if ASYNC_DB else get_read_db
+get_session_user = get_current_user_async if ASYNC_DB else get_current_user
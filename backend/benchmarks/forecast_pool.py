@@ -0,0 +1,89 @@
+"""Forecast throughput: threadpool versus the process pool at 1..N workers.
+
+Run with: python -m backend.benchmarks.forecast_pool [requests] [bills]
+
+Each request is one uncached 1825-day simulation. Threads share the GIL, so
+their throughput stays flat; the process pool should scale with the number of
+cores until it runs out of them.
+"""
+import asyncio
+import datetime as dt
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+from backend.forecast_pool import ForecastPool  # noqa: E402
+from backend.logic import FORECAST_HORIZON_DAYS, simulate  # noqa: E402
+
+
+def inputs(bills):
+    settings = SimpleNamespace(
+        debit_balance=5000,
+        credit_balance=800,
+        cc_pay_day=15,
+        cc_pay_method_value="Custom",
+        cc_pay_amount_value=250,
+        cc_pay_amount_unit_value=0,
+        cc_apr_value=22,
+    )
+    rows = [
+        {
+            "name": f"Bill {i}",
+            "amount": 10 + i,
+            "frequency": ("Monthly", "Weekly", "Biweekly")[i % 3],
+            "day": (str(i % 28 + 1), "Friday", "2026-01-02")[i % 3],
+            "type": "Credit" if i % 4 == 0 else "Debit",
+            "auto": False,
+        }
+        for i in range(bills)
+    ]
+    rows.append({"name": "Credit Card Bill", "amount": 250, "frequency": "Monthly", "day": 15, "type": "Debit", "auto": True})
+    incomes = [{"name": "Pay", "amount": 2500, "frequency": "Biweekly", "day": "2026-01-09", "type": "Credit"}]
+    return settings, rows, incomes
+
+
+def threaded(requests, workers, args):
+    with ThreadPoolExecutor(workers) as pool:
+        started = time.perf_counter()
+        list(pool.map(lambda _: simulate(*args), range(requests)))
+        return time.perf_counter() - started
+
+
+def pooled(requests, workers, args):
+    pool = ForecastPool(workers, queue_limit=requests)
+    pool.warm()
+
+    async def burst():
+        await asyncio.gather(*(pool.simulate(*args) for _ in range(requests)))
+
+    try:
+        started = time.perf_counter()
+        asyncio.run(burst())
+        return time.perf_counter() - started
+    finally:
+        pool.shutdown()
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    bills = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    settings, rows, incomes = inputs(bills)
+    args = (settings, rows, incomes, dt.date.today(), FORECAST_HORIZON_DAYS)
+    cores = os.cpu_count() or 1
+    print(f"{requests} forecasts of {FORECAST_HORIZON_DAYS} days, {bills} bills, {cores} cores")
+    counts = sorted({1, 2, 4, cores})
+    for workers in counts:
+        elapsed = threaded(requests, workers, args)
+        print(f"  threads   x{workers:<2}: {requests / elapsed:7.1f} forecasts/s")
+    for workers in counts:
+        elapsed = pooled(requests, workers, args)
+        print(f"  processes x{workers:<2}: {requests / elapsed:7.1f} forecasts/s")
+
+
+if __name__ == "__main__":
+    main()
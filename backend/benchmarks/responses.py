@@ -0,0 +1,48 @@
+"""Encode time and wire size of an 1825-day /api/libraries response.
+
+Run with: python -m backend.benchmarks.responses [bills]
+
+Compares FastAPI's default path (jsonable_encoder + JSONResponse) with
+FastJSONResponse, then the bytes each negotiated encoding puts on the wire.
+"""
+import datetime as dt
+import gzip
+import sys
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from backend.benchmarks.forecast_pool import inputs
+from backend.logic import FORECAST_HORIZON_DAYS, simulate
+from backend.responses import BROTLI_QUALITY, GZIP_LEVEL, FastJSONResponse, brotli
+
+
+def best_ms(fn, number=20):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    bills = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    settings, rows, incomes = inputs(bills)
+    libraries = simulate(settings, rows, incomes, dt.date.today(), FORECAST_HORIZON_DAYS)
+
+    default_body = JSONResponse(jsonable_encoder(libraries)).body
+    fast_body = FastJSONResponse(libraries).body
+    print(f"{FORECAST_HORIZON_DAYS}-day libraries, {bills} bills")
+    print(f"  jsonable_encoder + json: {best_ms(lambda: JSONResponse(jsonable_encoder(libraries))):7.2f} ms")
+    print(f"  orjson FastJSONResponse: {best_ms(lambda: FastJSONResponse(libraries)):7.2f} ms")
+
+    print(f"  identity: {len(default_body):>9,} bytes (orjson {len(fast_body):,})")
+    gzip_ms = best_ms(lambda: gzip.compress(fast_body, GZIP_LEVEL))
+    print(f"  gzip -{GZIP_LEVEL}: {len(gzip.compress(fast_body, GZIP_LEVEL)):>9,} bytes, {gzip_ms:6.2f} ms")
+    if brotli is not None:
+        br_ms = best_ms(lambda: brotli.compress(fast_body, quality=BROTLI_QUALITY))
+        br_size = len(brotli.compress(fast_body, quality=BROTLI_QUALITY))
+        print(f"  br q{BROTLI_QUALITY}:   {br_size:>9,} bytes, {br_ms:6.2f} ms")
+    else:
+        print("  br: brotli not installed")
+
+
+if __name__ == "__main__":
+    main()
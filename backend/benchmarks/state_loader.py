@@ -0,0 +1,82 @@
+"""Compare the ORM state loader with backend.state.load_state.
+
+Run with: python -m backend.benchmarks.state_loader [rows_per_collection]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+from backend.db import Base, SessionLocal, engine  # noqa: E402
+from backend.models import Account, AlertSetting, Bill, Budget, Category, Income, User, UserSettings  # noqa: E402
+from backend.state import SETTINGS_FIELDS, load_state  # noqa: E402
+
+
+def orm_state(db, user_id):
+    """The per-collection ORM loader _state_response used before load_state."""
+    settings = db.query(UserSettings).filter(UserSettings.user_id == user_id).first()
+    state = {name: getattr(settings, name) for name in SETTINGS_FIELDS + ["version"]}
+    state["bills"] = [
+        {"id": b.id, "name": b.name, "amount": b.amount, "frequency": b.frequency, "day": b.day, "type": b.type}
+        for b in db.query(Bill).filter(Bill.user_id == user_id).all()
+    ]
+    state["income"] = [
+        {"id": i.id, "name": i.name, "amount": i.amount, "frequency": i.frequency, "day": i.day}
+        for i in db.query(Income).filter(Income.user_id == user_id).all()
+    ]
+    state["categories"] = [
+        {"id": c.id, "name": c.name, "type": c.type}
+        for c in db.query(Category).filter(Category.user_id == user_id).all()
+    ]
+    state["budgets"] = [
+        {"id": b.id, "category_id": b.category_id, "amount": b.amount, "period": b.period}
+        for b in db.query(Budget).filter(Budget.user_id == user_id).all()
+    ]
+    state["alerts"] = [
+        {"id": a.id, "type": a.type, "threshold": a.threshold, "enabled": a.enabled}
+        for a in db.query(AlertSetting).filter(AlertSetting.user_id == user_id).all()
+    ]
+    state["accounts"] = [
+        {"id": a.id, "name": a.name, "type": a.type, "balance": a.balance}
+        for a in db.query(Account).filter(Account.user_id == user_id).all()
+    ]
+    return state
+
+
+def seed(rows):
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(email="bench@local", username="bench", password_hash="x")
+        db.add(user)
+        db.flush()
+        db.add(UserSettings(user_id=user.id, debit_balance=1000, credit_balance=200, cc_pay_day=12))
+        for i in range(rows):
+            db.add(Bill(user_id=user.id, name=f"Bill {i}", amount=i, frequency="Monthly", day=str(i % 28), type="Debit"))
+            db.add(Income(user_id=user.id, name=f"Income {i}", amount=i, frequency="Biweekly", day="2026-01-02"))
+            db.add(Category(user_id=user.id, name=f"Category {i}", type="Expense"))
+            db.add(Budget(user_id=user.id, category_id=i + 1, amount=i, period="Monthly"))
+            db.add(AlertSetting(user_id=user.id, type="low_balance", threshold=i, enabled=bool(i % 2)))
+            db.add(Account(user_id=user.id, name=f"Account {i}", type="Checking", balance=i))
+        db.commit()
+        return user.id
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    user_id = seed(rows)
+    with SessionLocal() as db:
+        assert load_state(db, user_id) == orm_state(db, user_id)
+    for label, loader in (("orm", orm_state), ("core union", load_state)):
+        def run():
+            with SessionLocal() as db:
+                loader(db, user_id)
+
+        number = 50
+        best = min(timeit.repeat(run, number=number, repeat=5)) / number
+        print(f"{label:>11}: {best * 1000:7.2f} ms per request ({rows} rows x 6 collections)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,93 @@
 import datetime as dt
 import os
+from typing import Any, Dict, Type
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 DB_URL = os.environ.get("DATABASE_URL", "sqlite:///budget_app.db")
+# Opt-in: serve the I/O-bound endpoints from an AsyncSession on the event loop.
+ASYNC_DB = os.environ.get("BUDGET_APP_ASYNC_DB", "").lower() in ("1", "true", "yes")
+# Other databases need an explicit async driver in DATABASE_URL.
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite"}
 
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
+# "production" turns on WAL and the pragmas below and gives read-only endpoints
+# their own pool of query_only connections, so readers never queue behind the
+# writer. Only meaningful for SQLite URLs.
+SQLITE_PROFILE = os.environ.get("BUDGET_APP_SQLITE_PROFILE", "default").lower()
+READ_POOL_SIZE = int(os.environ.get("BUDGET_APP_READ_POOL_SIZE", "8"))
+PRODUCTION_PRAGMAS = [
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("busy_timeout", os.environ.get("BUDGET_APP_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    ("mmap_size", os.environ.get("BUDGET_APP_SQLITE_MMAP_BYTES", str(256 * 1024 * 1024))),
+    ("cache_size", os.environ.get("BUDGET_APP_SQLITE_CACHE_KB", "-65536")),
+]
+
+IS_SQLITE = DB_URL.startswith("sqlite")
+SPLIT_READS = IS_SQLITE and SQLITE_PROFILE == "production" and ":memory:" not in DB_URL
+
+
+def apply_sqlite_pragmas(target, read_only: bool = False) -> None:
+    """Set the production pragmas on every new DBAPI connection of `target`."""
+
+    @event.listens_for(target, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in PRODUCTION_PRAGMAS:
+                cursor.execute(f"PRAGMA {name}={value}")
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+
+
+def connect_args(url: str) -> Dict[str, Any]:
+    # SQLite connections are shared across the threadpool; other drivers take no such flag.
+    return {"check_same_thread": False} if url.startswith("sqlite") else {}
+
+
+engine = create_engine(DB_URL, connect_args=connect_args(DB_URL))
+read_engine = engine
+if SPLIT_READS:
+    apply_sqlite_pragmas(engine)
+    read_engine = create_engine(
+        DB_URL,
+        connect_args=connect_args(DB_URL),
+        pool_size=READ_POOL_SIZE,
+        max_overflow=READ_POOL_SIZE,
+    )
+    apply_sqlite_pragmas(read_engine, read_only=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False, autocommit=False)
+
+
+def async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    if "+" in scheme:
+        return url
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(async_url(DB_URL))
+    if SPLIT_READS:
+        apply_sqlite_pragmas(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def dialect_insert(db: Session, model: Type[Any]) -> Any:
+    """INSERT for the session's dialect, which offers on_conflict_do_nothing/do_update."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
 
 
 class Base(DeclarativeBase):
@@ -0,0 +1,229 @@
+import datetime as dt
+import itertools
+from typing import Any, Dict, List
+
+import numpy as np
+
+from backend.logic import _payment_amount_for_balance, _signed_amount
+from backend.models import UserSettings
+from backend.recurrence import compile_recurrence
+
+
+def _day_range(start: dt.date, days: int) -> np.ndarray:
+    first = np.datetime64(start, "D")
+    return np.arange(first, first + days + 1, dtype="datetime64[D]")
+
+
+def _scatter(deltas: np.ndarray, offsets: List[np.ndarray], amounts: List[int]) -> None:
+    if offsets:
+        weights = np.repeat(np.asarray(amounts, dtype=np.int64), [len(o) for o in offsets])
+        np.add.at(deltas, np.concatenate(offsets), weights)
+
+
+def simulate_libraries_numpy(
+    settings: UserSettings,
+    bills: List[Dict[str, Any]],
+    incomes: List[Dict[str, Any]],
+    start: dt.date,
+    days: int,
+) -> Dict[str, Any]:
+    """Array-based twin of logic.simulate_libraries with identical output."""
+    debit_bills: List[Dict[str, Any]] = []
+    credit_bills: List[Dict[str, Any]] = []
+    upcoming_incomes: List[Dict[str, Any]] = []
+    debit_offsets: List[np.ndarray] = []
+    debit_amounts: List[int] = []
+    credit_offsets: List[np.ndarray] = []
+    credit_amounts: List[int] = []
+    cc_bill = next((bill for bill in bills if bill.get("auto")), None)
+    day_range = _day_range(start, days)
+    day_dates = day_range.tolist()
+
+    for bill in bills:
+        if bill.get("auto"):
+            continue
+        typ = str(bill.get("type") or "").strip().lower()
+        is_debit = typ != "credit"
+        amt = _signed_amount(bill, is_income=False)
+        name = bill.get("name", "")
+        offsets = compile_recurrence(bill.get("frequency"), bill.get("day")).offsets_array(start, days)
+        entries = [{"date": day_dates[i], "name": name, "amount": abs(amt)} for i in offsets.tolist()]
+        if is_debit:
+            debit_bills.extend(entries)
+            debit_offsets.append(offsets)
+            debit_amounts.append(amt)
+        else:
+            credit_bills.extend(entries)
+            credit_offsets.append(offsets)
+            credit_amounts.append(amt)
+
+    for inc in incomes:
+        amt = _signed_amount(inc, is_income=True)
+        name = inc.get("name", "")
+        offsets = compile_recurrence(inc.get("frequency"), inc.get("day")).offsets_array(start, days)
+        upcoming_incomes.extend({"date": day_dates[i], "name": name, "amount": abs(amt)} for i in offsets.tolist())
+        debit_offsets.append(offsets)
+        debit_amounts.append(amt)
+
+    debit_deltas = np.zeros(days + 1, dtype=np.int64)
+    credit_deltas = np.zeros(days + 1, dtype=np.int64)
+    _scatter(debit_deltas, debit_offsets, debit_amounts)
+    _scatter(credit_deltas, credit_offsets, credit_amounts)
+    debit_start = int(settings.debit_balance or 0)
+    credit_start = int(settings.credit_balance or 0)
+
+    if cc_bill:
+        pay_offsets = compile_recurrence(cc_bill["frequency"], cc_bill["day"]).offsets(start, days)
+        apr = max(0, int(settings.cc_apr_value or 0))
+        monthly_rate = apr / 100 / 12
+        bill_prefix = np.cumsum(credit_deltas).tolist()
+        # Difference between the simulated card balance and the plain running
+        # sum of bill charges; payments, interest and the clamp at zero all
+        # feed into it.
+        adjustment = 0
+        for offset in pay_offsets:
+            base_balance = credit_start + adjustment + (bill_prefix[offset - 1] if offset else 0)
+            pay_amount = _payment_amount_for_balance(settings, base_balance)
+            if pay_amount > base_balance:
+                pay_amount = max(0, int(base_balance))
+            remaining_base = max(0, int(base_balance - pay_amount))
+            if pay_amount > 0:
+                debit_bills.append({"date": day_dates[offset], "name": "Credit Card Bill", "amount": pay_amount})
+                debit_deltas[offset] -= pay_amount
+                credit_deltas[offset] -= pay_amount
+            adjustment += remaining_base - base_balance
+            if monthly_rate > 0 and remaining_base > 0:
+                interest = int(round(remaining_base * monthly_rate))
+                if interest > 0:
+                    credit_deltas[offset] += interest
+                    adjustment += interest
+
+    dates = day_range.astype(str).tolist()
+    debit_series = (debit_start + np.cumsum(debit_deltas)).tolist()
+    credit_series = (credit_start + np.cumsum(credit_deltas)).tolist()
+    return {
+        "upcoming_debit_bills": debit_bills,
+        "upcoming_credit_bills": credit_bills,
+        "upcoming_incomes": upcoming_incomes,
+        "debit_balance_forecast": [{"date": d, "balance": b} for d, b in zip(dates, debit_series)],
+        "credit_balance_forecast": [{"date": d, "balance": b} for d, b in zip(dates, credit_series)],
+    }
+
+
+def _expand_series(series: Dict[str, Any], dates: List[str]) -> List[Dict[str, Any]]:
+    deltas = [0] * len(dates)
+    for offset, delta in zip(series["offsets"], series["deltas"]):
+        deltas[offset] = delta
+    deltas[0] = series["base"]
+    return [{"date": d, "balance": b} for d, b in zip(dates, itertools.accumulate(deltas))]
+
+
+def _expand_entries(columns: Dict[str, List[int]], days: List[dt.date], names: List[str]) -> List[Dict[str, Any]]:
+    return [
+        {"date": days[offset], "name": names[name], "amount": amount}
+        for offset, amount, name in zip(columns["offset"], columns["amount"], columns["name"])
+    ]
+
+
+def expand_libraries(compact: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of logic.compact_libraries."""
+    day_range = _day_range(dt.date.fromisoformat(compact["start"]), compact["days"])
+    days = day_range.tolist()
+    dates = day_range.astype(str).tolist()
+    names = compact["names"]
+    return {
+        "upcoming_debit_bills": _expand_entries(compact["upcoming_debit_bills"], days, names),
+        "upcoming_credit_bills": _expand_entries(compact["upcoming_credit_bills"], days, names),
+        "upcoming_incomes": _expand_entries(compact["upcoming_incomes"], days, names),
+        "debit_balance_forecast": _expand_series(compact["debit_balance_forecast"], dates),
+        "credit_balance_forecast": _expand_series(compact["credit_balance_forecast"], dates),
+    }
+
+
+class RangeMin:
+    """Sparse table answering min(values[lo..hi]) in O(1) after O(n log n) setup."""
+
+    def __init__(self, values: List[int]) -> None:
+        levels = [np.asarray(values, dtype=np.int64)]
+        width = 1
+        while width * 2 <= len(levels[0]):
+            previous = levels[-1]
+            levels.append(np.minimum(previous[:-width], previous[width:]))
+            width *= 2
+        self._levels = levels
+
+    def __len__(self) -> int:
+        return len(self._levels[0])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(level.nbytes for level in self._levels)
+
+    def query(self, lo: int, hi: int) -> int:
+        if not 0 <= lo <= hi < len(self):
+            raise IndexError(f"range [{lo}, {hi}] outside 0..{len(self) - 1}")
+        k = (hi - lo + 1).bit_length() - 1
+        level = self._levels[k]
+        return int(min(level[lo], level[hi - (1 << k) + 1]))
+
+
+def _payment_amounts(settings: UserSettings, balance: np.ndarray) -> np.ndarray:
+    """Vectorized logic._payment_amount_for_balance."""
+    method = settings.cc_pay_method_value or "I want to pay my bill in full"
+    if method in ["I pay in full", "I want to pay my bill in full"]:
+        return np.maximum(0, balance)
+    if method in ["I pay the minimum", "Custom"]:
+        unit = settings.cc_pay_amount_unit_value
+        amount = settings.cc_pay_amount_value
+        if unit is None or amount is None:
+            return np.zeros_like(balance)
+        if int(unit) == 1:
+            return np.maximum(0, np.rint(balance * int(amount) / 100).astype(np.int64))
+        return np.full_like(balance, max(0, int(amount)))
+    return np.zeros_like(balance)
+
+
+def _card_payment_step(settings: UserSettings, balance: np.ndarray, monthly_rate: float) -> tuple:
+    """(payment, remaining, interest) on a pay day, as both engines compute them."""
+    pay = _payment_amounts(settings, balance)
+    pay = np.where(pay > balance, np.maximum(0, balance), pay)
+    remaining = np.maximum(0, balance - pay)
+    interest = np.zeros_like(balance)
+    if monthly_rate > 0:
+        interest = np.where(remaining > 0, np.rint(remaining * monthly_rate).astype(np.int64), 0)
+        interest = np.maximum(0, interest)
+    return pay, remaining, interest
+
+
+def whatif_debit_balances(
+    settings: UserSettings,
+    debit: np.ndarray,
+    credit: np.ndarray,
+    pay_offsets: List[int],
+    debit_deltas: np.ndarray,
+    credit_deltas: np.ndarray,
+) -> np.ndarray:
+    """Debit balance series, one row per scenario, layered on the base forecast."""
+    extra_charges = np.cumsum(credit_deltas, axis=1)
+    debit_changes = debit_deltas.copy()
+    credit_start = int(settings.credit_balance or 0)
+    monthly_rate = max(0, int(settings.cc_apr_value or 0)) / 100 / 12
+    rows = debit_deltas.shape[0]
+    base_correction = np.zeros(1, dtype=np.int64)
+    correction = np.zeros(rows, dtype=np.int64)
+    drift = np.zeros(rows, dtype=np.int64)
+    # Replay each pay day for all scenarios at once and apply only the change
+    # from the base payment. correction tracks the card's running balance past
+    # the displayed series' zero clamp; drift is extra interest net of extra pay.
+    for offset in pay_offsets:
+        shown = int(credit[offset - 1]) if offset else credit_start
+        base_balance = shown + base_correction
+        base_pay, base_remaining, base_interest = _card_payment_step(settings, base_balance, monthly_rate)
+        base_correction += base_pay + base_remaining - base_balance
+
+        balance = shown + (extra_charges[:, offset - 1] if offset else 0) + drift + correction
+        pay, remaining, interest = _card_payment_step(settings, balance, monthly_rate)
+        correction += pay + remaining - balance
+        drift += (interest - pay) - (base_interest - base_pay)
+        debit_changes[:, offset] -= pay - base_pay
+    return debit[np.newaxis, :] + np.cumsum(debit_changes, axis=1)
@@ -0,0 +1,102 @@
+import datetime as dt
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from backend.executors import BoundedExecutor
+from backend.logic import (
+    FORECAST_SETTINGS_FIELDS,
+    _empty_libraries,
+    compact_libraries,
+    forecast_cache,
+    forecast_key,
+    libraries_window,
+    load_forecast_inputs,
+    plain_settings,
+    simulate,
+)
+
+# 0 keeps forecasts in-process; N > 0 runs them on N worker processes. Leave it
+# at 0 on single-core hosts, where the workers only compete with the parent.
+FORECAST_WORKERS = int(os.environ.get("BUDGET_APP_FORECAST_WORKERS", "0"))
+FORECAST_QUEUE_LIMIT = int(os.environ.get("BUDGET_APP_FORECAST_QUEUE_LIMIT", "32"))
+
+
+def _warm_worker() -> None:
+    # Pay for the imports once per process, before the first real request.
+    simulate(SimpleNamespace(**dict.fromkeys(FORECAST_SETTINGS_FIELDS)), [], [], dt.date.today(), 30)
+
+
+def _simulate_in_worker(
+    settings: Any, bills: List[Dict[str, Any]], incomes: List[Dict[str, Any]], start: dt.date, days: int
+) -> Dict[str, Any]:
+    # Rows of dicts cost more to pickle back than to simulate; ship the
+    # columnar form and rebuild the rows in the parent.
+    return compact_libraries(simulate(settings, bills, incomes, start, days), start)
+
+
+def _load_plain_inputs(db: Session, user_id: int) -> Optional[tuple]:
+    inputs = load_forecast_inputs(db, user_id)
+    if inputs is None:
+        return None
+    settings, bills, incomes = inputs
+    return plain_settings(settings), bills, incomes
+
+
+class ForecastPool(BoundedExecutor):
+    """Runs forecast simulations on a warm pool of worker processes.
+
+    The simulation is pure CPU, so threads only ever use one core between
+    them. Requests load their inputs as plain data in the threadpool and await
+    the result here. Only worth enabling with more than one core to spare.
+    """
+
+    busy_detail = "Forecast queue is full, try again shortly"
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+
+    def warm(self) -> None:
+        """Start every worker now instead of on the first request."""
+        pool = self._pool()
+        for future in [pool.submit(_warm_worker) for _ in range(self.workers)]:
+            future.result()
+
+    async def simulate(
+        self, settings: Any, bills: List[Dict[str, Any]], incomes: List[Dict[str, Any]], start: dt.date, days: int
+    ) -> Dict[str, Any]:
+        from backend.forecast import expand_libraries
+
+        compact = await self.run(_simulate_in_worker, settings, bills, incomes, start, days)
+        return await run_in_threadpool(expand_libraries, compact)
+
+    async def build_libraries(self, db: Session, user_id: int, days: int) -> Dict[str, Any]:
+        """Async counterpart of logic.build_upcoming_libraries, sharing its cache."""
+        key = await run_in_threadpool(forecast_key, db, user_id, days)
+        data = forecast_cache.get(key) if key is not None else None
+        if data is not None:
+            return libraries_window(data, key, days)
+        inputs = await run_in_threadpool(_load_plain_inputs, db, user_id)
+        if inputs is None:
+            return _empty_libraries()
+        if key is None:
+            return await self.simulate(*inputs, dt.date.today(), days)
+        data = await self.simulate(*inputs, key[2], key[3])
+        forecast_cache.put(key, data)
+        return libraries_window(data, key, days)
+
+
+forecast_pool = ForecastPool(FORECAST_WORKERS, FORECAST_QUEUE_LIMIT)
@@ -0,0 +1,22 @@
+# Multi-worker deployment: gunicorn -c backend/gunicorn.conf.py backend.main:app
+#
+# Workers share nothing in memory. Forecast cache entries are keyed by the
+# user's UserSettings.version, which every write bumps in the database, so a
+# worker never serves a forecast computed before another worker's write.
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.environ.get("BUDGET_APP_WORKER_TIMEOUT", "60"))
+graceful_timeout = 30
+
+
+def on_starting(server):
+    # Migrate once in the master so workers booting side by side never race on
+    # a fresh schema; each worker's lifespan check then finds it current.
+    from backend.db import engine
+    from backend.migrations import run_migrations
+
+    run_migrations(engine)
+    engine.dispose()
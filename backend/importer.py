@@ -0,0 +1,201 @@
+import csv
+import datetime as dt
+import hashlib
+import io
+import os
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Column, Date, Integer, MetaData, String, Table, delete, insert, select
+from sqlalchemy.orm import Session
+
+from backend.db import dialect_insert
+from backend.logic import refresh_recurring_patterns
+from backend.models import Transaction
+from backend.summaries import Totals, add_to_totals, apply_transaction_totals
+
+
+IMPORT_BATCH_SIZE = int(os.environ.get("BUDGET_APP_IMPORT_BATCH_SIZE", "1000"))
+# Distinct (date, name, amount) keys whose ordinals an import keeps in memory.
+IMPORT_ORDINAL_KEYS = int(os.environ.get("BUDGET_APP_IMPORT_ORDINAL_KEYS", "50000"))
+
+
+def parse_transaction_row(row: Dict[str, Any]) -> Optional[Tuple[dt.date, str, float]]:
+    date_value = row.get("date") or row.get("Date")
+    name = row.get("name") or row.get("description") or row.get("Description") or ""
+    amount_value = row.get("amount") or row.get("Amount")
+    if not date_value or amount_value is None:
+        return None
+    try:
+        date = dt.datetime.fromisoformat(date_value).date()
+    except Exception:
+        try:
+            date = dt.datetime.strptime(date_value, "%m/%d/%Y").date()
+        except Exception:
+            return None
+    try:
+        amount = float(amount_value)
+    except Exception:
+        return None
+    return date, name, amount
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(str(name or "").lower().split())
+
+
+ordinal_metadata = MetaData()
+# Per-day ordinal counts the Fingerprinter evicts from memory, kept for the
+# length of one import on the import's own connection.
+import_ordinals = Table(
+    "import_ordinals",
+    ordinal_metadata,
+    Column("date", Date, nullable=False, index=True),
+    Column("name", String(255), nullable=False),
+    Column("cents", Integer, nullable=False),
+    Column("count", Integer, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
+class Fingerprinter:
+    """Assigns dedupe fingerprints to transactions in file order.
+
+    A fingerprint hashes (user, date, normalized name, amount in cents,
+    ordinal), where the ordinal counts earlier rows with the same key. Two
+    identical coffees on the same day stay distinct, and re-importing the
+    same statement reproduces the same fingerprints. Counts for the most
+    recently seen days stay in memory up to `max_keys`; older days move to
+    the import_ordinals temp table and are read back if the file returns to
+    them, so memory stays fixed however long the file is.
+    """
+
+    def __init__(self, db: Session, user_id: int, max_keys: Optional[int] = None) -> None:
+        self.db = db
+        self.user_id = user_id
+        self.max_keys = max(1, max_keys or IMPORT_ORDINAL_KEYS)
+        self._days: "OrderedDict[dt.date, Dict[Tuple[str, int], int]]" = OrderedDict()
+        self._keys = 0
+        self._spilled: Set[dt.date] = set()
+
+    def __call__(self, date: dt.date, name: str, amount: float) -> str:
+        counts = self._counts(date)
+        key = (normalize_name(name), int(round(amount * 100)))
+        ordinal = counts.get(key, 0)
+        if not ordinal:
+            self._keys += 1
+        counts[key] = ordinal + 1
+        while self._keys > self.max_keys and len(self._days) > 1:
+            self._spill(*self._days.popitem(last=False))
+        raw = f"{self.user_id}|{date.isoformat()}|{key[0]}|{key[1]}|{ordinal}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _counts(self, date: dt.date) -> Dict[Tuple[str, int], int]:
+        counts = self._days.get(date)
+        if counts is None:
+            counts = self._load(date) if date in self._spilled else {}
+            self._days[date] = counts
+            self._keys += len(counts)
+        self._days.move_to_end(date)
+        return counts
+
+    def _spill(self, date: dt.date, counts: Dict[Tuple[str, int], int]) -> None:
+        conn = self.db.connection()
+        if not self._spilled:
+            import_ordinals.create(conn, checkfirst=True)
+        conn.execute(delete(import_ordinals).where(import_ordinals.c.date == date))
+        conn.execute(
+            insert(import_ordinals),
+            [{"date": date, "name": name, "cents": cents, "count": n} for (name, cents), n in counts.items()],
+        )
+        self._spilled.add(date)
+        self._keys -= len(counts)
+
+    def _load(self, date: dt.date) -> Dict[Tuple[str, int], int]:
+        t = import_ordinals
+        rows = self.db.connection().execute(select(t.c.name, t.c.cents, t.c.count).where(t.c.date == date))
+        return {(name, cents): n for name, cents, n in rows}
+
+    def close(self) -> None:
+        if self._spilled:
+            import_ordinals.drop(self.db.connection(), checkfirst=True)
+
+
+def import_transactions(
+    db: Session, user_id: int, stream: BinaryIO, batch_size: Optional[int] = None
+) -> Tuple[int, int, int]:
+    """Stream a CSV upload into the transactions table.
+
+    The upload is decoded incrementally and rows are inserted in
+    executemany batches, so memory use is bounded by the batch size rather
+    than the file size. Rows whose fingerprint already exists are dropped
+    by the INSERT itself. Weekly and monthly rollups are updated in
+    the same transaction, as are the recurring patterns of every name the
+    import touched. Returns (imported, skipped, duplicates).
+    """
+    batch_size = max(1, batch_size or IMPORT_BATCH_SIZE)
+    text = io.TextIOWrapper(stream, encoding="utf-8", errors="ignore", newline="")
+    daily: Totals = {}
+    names: Set[str] = set()
+    try:
+        counts = _insert_rows(db, user_id, csv.DictReader(text), batch_size, daily, names)
+    finally:
+        # Leave the upload's file object open for its owner.
+        text.detach()
+    apply_transaction_totals(db, user_id, daily)
+    refresh_recurring_patterns(db, user_id, names)
+    db.commit()
+    return counts
+
+
+def _flush(db: Session, batch: List[Dict[str, Any]], daily: Totals, names: Set[str]) -> int:
+    # The INSERT itself skips stored fingerprints, so two overlapping uploads
+    # cannot both pass a lookup and then collide on the unique index.
+    stmt = dialect_insert(db, Transaction).on_conflict_do_nothing(index_elements=[Transaction.fingerprint])
+    inserted = db.execute(stmt.returning(Transaction.date, Transaction.name, Transaction.amount), batch).all()
+    for date, name, amount in inserted:
+        add_to_totals(daily, date, amount)
+        names.add(name)
+    return len(inserted)
+
+
+def _insert_rows(
+    db: Session,
+    user_id: int,
+    reader: Iterable[Dict[str, Any]],
+    batch_size: int,
+    daily: Totals,
+    names: Set[str],
+) -> Tuple[int, int, int]:
+    fingerprint = Fingerprinter(db, user_id)
+    imported = 0
+    skipped = 0
+    seen = 0
+    batch: List[Dict[str, Any]] = []
+    for row in reader:
+        parsed = parse_transaction_row(row)
+        if parsed is None:
+            skipped += 1
+            continue
+        date, name, amount = parsed
+        batch.append(
+            {
+                "user_id": user_id,
+                "date": date,
+                "name": name,
+                "amount": amount,
+                "type": "Debit" if amount < 0 else "Credit",
+                "source": "csv",
+                "fingerprint": fingerprint(date, name, amount),
+            }
+        )
+        if len(batch) >= batch_size:
+            seen += len(batch)
+            imported += _flush(db, batch, daily, names)
+            batch = []
+    if batch:
+        seen += len(batch)
+        imported += _flush(db, batch, daily, names)
+    fingerprint.close()
+    return imported, skipped, seen - imported
+
@@ -1,100 +1,34 @@
 import datetime as dt
-from typing import Any, Dict, List, Optional
+import os
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from sqlalchemy import case, delete, func, insert, select
 from sqlalchemy.orm import Session
 
-from backend.models import Bill, Income, Transaction, UserSettings
+from backend.models import Bill, Income, RecurringPattern, Transaction, UserSettings
+from backend.recurrence import _as_date, compile_recurrence
 
 
-def _as_date(value: Any) -> Optional[dt.date]:
-    if isinstance(value, dt.date):
-        return value
-    if isinstance(value, dt.datetime):
-        return value.date()
-    try:
-        return dt.datetime.fromisoformat(str(value)).date()
-    except Exception:
-        return None
+FORECAST_ENGINE = os.environ.get("BUDGET_APP_FORECAST_ENGINE", "python").strip().lower()
+FORECAST_HORIZON_DAYS = 1825
+ALERT_WINDOW_DAYS = 14
+FORECAST_CACHE_BYTES = int(os.environ.get("BUDGET_APP_FORECAST_CACHE_BYTES", str(64 * 1024 * 1024)))
 
 
-def occurrences_for_entry(entry: Dict[str, Any], start_date: dt.date, days: int, is_income: bool) -> List[Any]:
-    out = []
-    end = start_date + dt.timedelta(days=days)
-    freq = str(entry.get("frequency") or "").lower()
-    name = entry.get("name", "")
-    amt = int(entry.get("amount", 0))
+def _signed_amount(entry: Dict[str, Any], is_income: bool) -> int:
     typ = (entry.get("type") or "").strip().lower()
     sign = 1 if is_income else (1 if typ == "credit" else -1)
-    day = entry.get("day")
-
-    if "biweekly" in freq:
-        anchor = _as_date(day)
-        if not anchor:
-            return out
-        occ = anchor
-        if occ < start_date:
-            k = ((start_date - occ).days + 13) // 14
-            occ = occ + dt.timedelta(days=14 * k)
-        while occ <= end:
-            out.append((occ, amt * sign, name, entry))
-            occ += dt.timedelta(days=14)
-    elif "weekly" in freq:
-        if isinstance(day, str):
-            try:
-                target = [
-                    "monday",
-                    "tuesday",
-                    "wednesday",
-                    "thursday",
-                    "friday",
-                    "saturday",
-                    "sunday",
-                ].index(day.lower())
-            except Exception:
-                target = start_date.weekday()
-        elif hasattr(day, "weekday"):
-            target = day.weekday()
-        else:
-            target = start_date.weekday()
-        delta = (target - start_date.weekday()) % 7
-        occ = start_date + dt.timedelta(days=delta)
-        while occ <= end:
-            out.append((occ, amt * sign, name, entry))
-            occ += dt.timedelta(weeks=1)
-    elif "monthly" in freq:
-        try:
-            dom = int(day)
-        except Exception:
-            dom = start_date.day
-        year = start_date.year
-        month = start_date.month
-        while True:
-            try:
-                candidate = dt.date(year, month, min(dom, 28))
-            except Exception:
-                candidate = None
-            if candidate and start_date <= candidate <= end:
-                out.append((candidate, amt * sign, name, entry))
-            if year > end.year or (year == end.year and month >= end.month):
-                break
-            if month == 12:
-                year += 1
-                month = 1
-            else:
-                month += 1
-    elif "ann" in freq:
-        anchor = _as_date(day)
-        if anchor:
-            occ = dt.date(start_date.year, anchor.month, anchor.day)
-            if occ < start_date:
-                occ = dt.date(start_date.year + 1, anchor.month, anchor.day)
-            if start_date <= occ <= end:
-                out.append((occ, amt * sign, name, entry))
-    else:
-        occ = _as_date(day)
-        if occ and start_date <= occ <= end:
-            out.append((occ, amt * sign, name, entry))
-    return out
+    return int(entry.get("amount", 0)) * sign
+
+
+def occurrences_for_entry(entry: Dict[str, Any], start_date: dt.date, days: int, is_income: bool) -> List[Any]:
+    amt = _signed_amount(entry, is_income)
+    name = entry.get("name", "")
+    recurrence = compile_recurrence(entry.get("frequency"), entry.get("day"))
+    return [(occ, amt, name, entry) for occ in recurrence.iter_dates(start_date, days)]
 
 
 def credit_card_payment_amount(settings: UserSettings) -> Optional[int]:
@@ -144,25 +78,22 @@ def _payment_amount_for_balance(settings: UserSettings, balance: int) -> int:
     return 0
 
 
-def build_upcoming_libraries(db: Session, user_id: int, days: int = 1825) -> Dict[str, Any]:
-    start = dt.date.today()
-    debit_bills: List[Dict[str, Any]] = []
-    credit_bills: List[Dict[str, Any]] = []
-    incomes: List[Dict[str, Any]] = []
-    debit_changes: Dict[dt.date, int] = {}
-    credit_changes: Dict[dt.date, int] = {}
-    income_changes: Dict[dt.date, int] = {}
+def _empty_libraries() -> Dict[str, Any]:
+    return {
+        "upcoming_debit_bills": [],
+        "upcoming_credit_bills": [],
+        "upcoming_incomes": [],
+        "debit_balance_forecast": [],
+        "credit_balance_forecast": [],
+    }
 
+
+def load_forecast_inputs(
+    db: Session, user_id: int
+) -> Optional[Tuple[UserSettings, List[Dict[str, Any]], List[Dict[str, Any]]]]:
     settings = db.query(UserSettings).filter(UserSettings.user_id == user_id).first()
     if not settings:
-        return {
-            "upcoming_debit_bills": [],
-            "upcoming_credit_bills": [],
-            "upcoming_incomes": [],
-            "debit_balance_forecast": [],
-            "credit_balance_forecast": [],
-        }
-
+        return None
     bills = [
         {
             "name": b.name,
@@ -177,36 +108,59 @@ def build_upcoming_libraries(db: Session, user_id: int, days: int = 1825) -> Dic
     cc_bill = credit_card_bill_entry(settings)
     if cc_bill:
         bills.append(cc_bill)
+    incomes = [
+        {
+            "name": inc.name,
+            "amount": inc.amount,
+            "frequency": inc.frequency,
+            "day": inc.day,
+            "type": "Credit",
+        }
+        for inc in db.query(Income).filter(Income.user_id == user_id).all()
+    ]
+    return settings, bills, incomes
+
+
+def simulate_libraries(
+    settings: UserSettings,
+    bills: List[Dict[str, Any]],
+    incomes: List[Dict[str, Any]],
+    start: dt.date,
+    days: int,
+) -> Dict[str, Any]:
+    debit_bills: List[Dict[str, Any]] = []
+    credit_bills: List[Dict[str, Any]] = []
+    upcoming_incomes: List[Dict[str, Any]] = []
+    debit_changes: Dict[dt.date, int] = {}
+    credit_changes: Dict[dt.date, int] = {}
+    income_changes: Dict[dt.date, int] = {}
+    cc_bill = next((bill for bill in bills if bill.get("auto")), None)
 
     for bill in bills:
         if bill.get("auto"):
             continue
         typ = str(bill.get("type") or "").strip().lower()
         is_debit = typ != "credit"
-        for occ_date, amt, name, _ in occurrences_for_entry(bill, start, days, is_income=False):
-            entry = {"date": occ_date, "name": name, "amount": abs(int(amt))}
+        amt = _signed_amount(bill, is_income=False)
+        name = bill.get("name", "")
+        for occ_date in compile_recurrence(bill.get("frequency"), bill.get("day")).iter_dates(start, days):
+            entry = {"date": occ_date, "name": name, "amount": abs(amt)}
             if is_debit:
                 debit_bills.append(entry)
-                debit_changes[occ_date] = debit_changes.get(occ_date, 0) + int(amt)
+                debit_changes[occ_date] = debit_changes.get(occ_date, 0) + amt
             else:
                 credit_bills.append(entry)
-                credit_changes[occ_date] = credit_changes.get(occ_date, 0) + int(amt)
+                credit_changes[occ_date] = credit_changes.get(occ_date, 0) + amt
 
-    for inc in db.query(Income).filter(Income.user_id == user_id).all():
-        entry = {
-            "name": inc.name,
-            "amount": inc.amount,
-            "frequency": inc.frequency,
-            "day": inc.day,
-            "type": "Credit",
-        }
-        for occ_date, amt, name, _ in occurrences_for_entry(entry, start, days, is_income=True):
-            incomes.append({"date": occ_date, "name": name, "amount": abs(int(amt))})
-            income_changes[occ_date] = income_changes.get(occ_date, 0) + int(amt)
+    for inc in incomes:
+        amt = _signed_amount(inc, is_income=True)
+        name = inc.get("name", "")
+        for occ_date in compile_recurrence(inc.get("frequency"), inc.get("day")).iter_dates(start, days):
+            upcoming_incomes.append({"date": occ_date, "name": name, "amount": abs(amt)})
+            income_changes[occ_date] = income_changes.get(occ_date, 0) + amt
 
     if cc_bill:
-        cc_occurrences = [d for d, _, _, _ in occurrences_for_entry(cc_bill, start, days, is_income=False)]
-        cc_dates = set(cc_occurrences)
+        cc_dates = set(compile_recurrence(cc_bill["frequency"], cc_bill["day"]).iter_dates(start, days))
         apr = max(0, int(settings.cc_apr_value or 0))
         monthly_rate = apr / 100 / 12
         credit_running = int(settings.credit_balance or 0)
@@ -255,46 +209,512 @@ def build_upcoming_libraries(db: Session, user_id: int, days: int = 1825) -> Dic
     return {
         "upcoming_debit_bills": debit_bills,
         "upcoming_credit_bills": credit_bills,
-        "upcoming_incomes": incomes,
+        "upcoming_incomes": upcoming_incomes,
         "debit_balance_forecast": debit_balance_series,
         "credit_balance_forecast": credit_balance_series,
     }
 
 
+def _estimate_forecast_bytes(data: Dict[str, Any]) -> int:
+    # Rough per-row footprint of the dicts, ISO strings and ints in a forecast.
+    rows = len(data["debit_balance_forecast"]) + len(data["credit_balance_forecast"])
+    entries = len(data["upcoming_debit_bills"]) + len(data["upcoming_credit_bills"]) + len(data["upcoming_incomes"])
+    return 1024 + rows * 280 + entries * 320
+
+
+def _derived_bytes(value: Any) -> int:
+    if isinstance(value, tuple):
+        return sum(_derived_bytes(item) for item in value)
+    return int(getattr(value, "nbytes", 0))
+
+
+def _slice_libraries(data: Dict[str, Any], start: dt.date, days: int) -> Dict[str, Any]:
+    end = start + dt.timedelta(days=days)
+    return {
+        "upcoming_debit_bills": [e for e in data["upcoming_debit_bills"] if e["date"] <= end],
+        "upcoming_credit_bills": [e for e in data["upcoming_credit_bills"] if e["date"] <= end],
+        "upcoming_incomes": [e for e in data["upcoming_incomes"] if e["date"] <= end],
+        "debit_balance_forecast": data["debit_balance_forecast"][: days + 1],
+        "credit_balance_forecast": data["credit_balance_forecast"][: days + 1],
+    }
+
+
+class ForecastCache:
+    """LRU of per-user forecasts keyed by (user_id, state version, today, horizon)."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        # key -> (data, approximate bytes, structures derived from data)
+        self._entries: "OrderedDict[Tuple[int, int, dt.date, int], Tuple[Dict[str, Any], int, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+        self._versions: Dict[int, int] = {}
+        self._bytes = 0
+        self._day: Optional[dt.date] = None
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[int, int, dt.date, int]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if self._day != key[2]:
+                self._drop(lambda k: True)
+                self._day = key[2]
+            user_id, version = key[0], key[1]
+            if version > self._versions.get(user_id, -1):
+                self._versions[user_id] = version
+                self._drop(lambda k: k[0] == user_id and k[1] < version)
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            self._entries.move_to_end(key)
+            return item[0]
+
+    def put(self, key: Tuple[int, int, dt.date, int], data: Dict[str, Any]) -> None:
+        size = _estimate_forecast_bytes(data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key[1] < self._versions.get(key[0], 0) or key[2] != self._day:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (data, size, {})
+            self._bytes += size
+            self._evict()
+
+    def derived(self, key: Tuple[int, int, dt.date, int], name: str, data: Dict[str, Any], build) -> Any:
+        """build(data), kept with the entry under key so it is built once per entry."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] is data and name in item[2]:
+                return item[2][name]
+        value = build(data)
+        size = _derived_bytes(value)
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] is data and name not in item[2]:
+                item[2][name] = value
+                self._entries[key] = (data, item[1] + size, item[2])
+                self._bytes += size
+                self._evict()
+        return value
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._drop(lambda k: k[0] == user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._drop(lambda k: True)
+            self._versions.clear()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes:
+            _, (_, evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+
+    def _drop(self, predicate) -> None:
+        for key in [k for k in self._entries if predicate(k)]:
+            self._bytes -= self._entries.pop(key)[1]
+
+
+forecast_cache = ForecastCache(FORECAST_CACHE_BYTES)
+
+
+def invalidate_forecast(user_id: int) -> None:
+    forecast_cache.invalidate(user_id)
+
+
+def state_version(db: Session, user_id: int) -> Optional[int]:
+    """The user's UserSettings.version, or None before settings exist."""
+    return db.execute(select(UserSettings.version).where(UserSettings.user_id == user_id)).scalar()
+
+
+def compute_upcoming_libraries(
+    db: Session,
+    user_id: int,
+    days: int = 1825,
+    engine: Optional[str] = None,
+    start: Optional[dt.date] = None,
+) -> Dict[str, Any]:
+    inputs = load_forecast_inputs(db, user_id)
+    if inputs is None:
+        return _empty_libraries()
+    settings, bills, incomes = inputs
+    return simulate(settings, bills, incomes, start or dt.date.today(), days, engine)
+
+
+def simulate(
+    settings: Any,
+    bills: List[Dict[str, Any]],
+    incomes: List[Dict[str, Any]],
+    start: dt.date,
+    days: int,
+    engine: Optional[str] = None,
+) -> Dict[str, Any]:
+    if (engine or FORECAST_ENGINE) == "numpy":
+        from backend.forecast import simulate_libraries_numpy
+
+        return simulate_libraries_numpy(settings, bills, incomes, start, days)
+    return simulate_libraries(settings, bills, incomes, start, days)
+
+
+# UserSettings columns the simulation reads; plain_settings copies just these
+# so the inputs can be pickled to a worker process.
+FORECAST_SETTINGS_FIELDS = [
+    "debit_balance",
+    "credit_balance",
+    "cc_pay_day",
+    "cc_pay_method_value",
+    "cc_pay_amount_value",
+    "cc_pay_amount_unit_value",
+    "cc_apr_value",
+]
+
+
+def plain_settings(settings: Any) -> SimpleNamespace:
+    return SimpleNamespace(**{name: getattr(settings, name) for name in FORECAST_SETTINGS_FIELDS})
+
+
+def build_upcoming_libraries(
+    db: Session, user_id: int, days: int = 1825, engine: Optional[str] = None
+) -> Dict[str, Any]:
+    key, data = _horizon_forecast(db, user_id, days, engine)
+    if key is None:
+        return data
+    return libraries_window(data, key, days)
+
+
+def _horizon_forecast(
+    db: Session, user_id: int, days: int, engine: Optional[str] = None
+) -> Tuple[Optional[Tuple[int, int, dt.date, int]], Dict[str, Any]]:
+    """(cache key, forecast over the cached horizon), or (None, days-long forecast)."""
+    key = forecast_key(db, user_id, days)
+    if key is None:
+        return None, compute_upcoming_libraries(db, user_id, days, engine)
+    data = forecast_cache.get(key)
+    if data is None:
+        data = compute_upcoming_libraries(db, user_id, key[3], engine, start=key[2])
+        if not data["debit_balance_forecast"]:
+            # No settings row yet; not worth caching.
+            return None, data
+        forecast_cache.put(key, data)
+    return key, data
+
+
+def forecast_key(db: Session, user_id: int, days: int) -> Optional[Tuple[int, int, dt.date, int]]:
+    """Cache key for a user's forecast horizon, or None when it can't be cached."""
+    if forecast_cache.max_bytes <= 0:
+        return None
+    version = state_version(db, user_id)
+    if version is None:
+        return None
+    return (user_id, version, dt.date.today(), max(days, FORECAST_HORIZON_DAYS))
+
+
+def libraries_window(data: Dict[str, Any], key: Tuple[int, int, dt.date, int], days: int) -> Dict[str, Any]:
+    if days == key[3]:
+        return dict(data)
+    return _slice_libraries(data, key[2], days)
+
+
+def _compact_series(series: List[Dict[str, Any]]) -> Dict[str, Any]:
+    offsets: List[int] = []
+    deltas: List[int] = []
+    previous = series[0]["balance"] if series else 0
+    for i in range(1, len(series)):
+        balance = series[i]["balance"]
+        if balance != previous:
+            offsets.append(i)
+            deltas.append(balance - previous)
+            previous = balance
+    return {"base": series[0]["balance"] if series else 0, "offsets": offsets, "deltas": deltas}
+
+
+def _compact_entries(entries: List[Dict[str, Any]], start: dt.date, names: Dict[str, int]) -> Dict[str, List[int]]:
+    columns: Dict[str, List[int]] = {"offset": [], "amount": [], "name": []}
+    for entry in entries:
+        columns["offset"].append((entry["date"] - start).days)
+        columns["amount"].append(entry["amount"])
+        columns["name"].append(names.setdefault(entry["name"], len(names)))
+    return columns
+
+
+def compact_libraries(data: Dict[str, Any], start: dt.date) -> Dict[str, Any]:
+    """Columnar encoding of a build_upcoming_libraries result."""
+    debit_series = data["debit_balance_forecast"]
+    if debit_series:
+        start = dt.date.fromisoformat(debit_series[0]["date"])
+    names: Dict[str, int] = {}
+    out = {
+        "format": "compact",
+        "start": start.isoformat(),
+        "days": max(0, len(debit_series) - 1),
+        "upcoming_debit_bills": _compact_entries(data["upcoming_debit_bills"], start, names),
+        "upcoming_credit_bills": _compact_entries(data["upcoming_credit_bills"], start, names),
+        "upcoming_incomes": _compact_entries(data["upcoming_incomes"], start, names),
+        "debit_balance_forecast": _compact_series(debit_series),
+        "credit_balance_forecast": _compact_series(data["credit_balance_forecast"]),
+    }
+    out["names"] = list(names)
+    return out
+
+
+def _debit_range_min(data: Dict[str, Any]) -> Any:
+    from backend.forecast import RangeMin
+
+    return RangeMin([item["balance"] for item in data["debit_balance_forecast"]])
+
+
+def safe_to_spend_windows(db: Session, user_id: int, windows: List[Tuple[int, int]]) -> List[int]:
+    """Lowest forecast debit balance over each inclusive (start, end) day window."""
+    if not windows:
+        return []
+    key, data = _horizon_forecast(db, user_id, max(end for _, end in windows))
+    series = data["debit_balance_forecast"]
+    if not series:
+        return [0] * len(windows)
+    if key is None:
+        index = _debit_range_min(data)
+    else:
+        index = forecast_cache.derived(key, "debit_range_min", data, _debit_range_min)
+    last = len(series) - 1
+    return [int(index.query(min(start, last), min(end, last))) for start, end in windows]
+
+
 def safe_to_spend(db: Session, user_id: int, days: int) -> int:
-    data = build_upcoming_libraries(db, user_id, days)
-    balances = [item["balance"] for item in data.get("debit_balance_forecast", [])]
-    if not balances:
-        return 0
-    return int(min(balances))
+    return safe_to_spend_windows(db, user_id, [(0, days)])[0]
 
 
-def recurring_suggestions(db: Session, user_id: int) -> List[Dict[str, Any]]:
-    txs = db.query(Transaction).filter(Transaction.user_id == user_id).all()
-    grouped: Dict[str, List[Transaction]] = {}
-    for tx in txs:
-        key = f"{tx.name}|{int(round(tx.amount, 0))}"
-        grouped.setdefault(key, []).append(tx)
-    suggestions = []
-    for key, items in grouped.items():
-        if len(items) < 3:
-            continue
-        items.sort(key=lambda x: x.date)
-        gaps = [(items[i].date - items[i - 1].date).days for i in range(1, len(items))]
-        avg_gap = sum(gaps) / len(gaps)
-        if 12 <= avg_gap <= 16:
-            freq = "Biweekly"
-        elif 26 <= avg_gap <= 33:
-            freq = "Monthly"
-        elif 6 <= avg_gap <= 8:
-            freq = "Weekly"
-        else:
+def _balance_arrays(data: Dict[str, Any]) -> Tuple[Any, Any]:
+    import numpy as np
+
+    return (
+        np.array([row["balance"] for row in data["debit_balance_forecast"]], dtype=np.int64),
+        np.array([row["balance"] for row in data["credit_balance_forecast"]], dtype=np.int64),
+    )
+
+
+def _balance_summary(balances: Any, start: dt.date, floor: int) -> Dict[str, Any]:
+    low = int(balances.argmin())
+    below = balances < floor
+    breach = int(below.argmax()) if below.any() else None
+    return {
+        "min_balance": int(balances[low]),
+        "min_date": (start + dt.timedelta(days=low)).isoformat(),
+        "first_breach": None if breach is None else (start + dt.timedelta(days=breach)).isoformat(),
+    }
+
+
+def whatif(
+    db: Session, user_id: int, scenarios: List[Dict[str, Any]], days: int, floor: Optional[int] = None
+) -> Dict[str, Any]:
+    """Lowest debit balance and first breach of `floor` for hypothetical purchases."""
+    import numpy as np
+
+    from backend.forecast import whatif_debit_balances
+
+    key, data = _horizon_forecast(db, user_id, days)
+    settings = db.query(UserSettings).filter(UserSettings.user_id == user_id).first()
+    if settings is None or not data["debit_balance_forecast"]:
+        return {"days": days, "floor": floor or 0, "baseline": None, "scenarios": []}
+    if floor is None:
+        floor = int(settings.debit_floor_target or 0)
+    if key is None:
+        debit, credit = _balance_arrays(data)
+    else:
+        debit, credit = forecast_cache.derived(key, "balance_arrays", data, _balance_arrays)
+    start = dt.date.fromisoformat(data["debit_balance_forecast"][0]["date"])
+    length = len(debit)
+
+    debit_deltas = np.zeros((len(scenarios), length), dtype=np.int64)
+    credit_deltas = np.zeros((len(scenarios), length), dtype=np.int64)
+    ignored = [0] * len(scenarios)
+    for row, scenario in enumerate(scenarios):
+        for item in scenario.get("items", []):
+            when = _as_date(item.get("date"))
+            offset = (when - start).days if when else -1
+            if not 0 <= offset <= days:
+                ignored[row] += 1
+                continue
+            amount = int(item.get("amount", 0))
+            typ = item.get("type", "Debit")
+            if typ == "Credit":
+                credit_deltas[row, offset] += amount
+            else:
+                debit_deltas[row, offset] += amount if typ == "Income" else -amount
+
+    pay_offsets: List[int] = []
+    if settings.cc_pay_day is not None:
+        pay_offsets = compile_recurrence("Monthly", int(settings.cc_pay_day)).offsets(start, length - 1)
+    balances = whatif_debit_balances(settings, debit, credit, pay_offsets, debit_deltas, credit_deltas)
+
+    window = days + 1
+    results = []
+    for row, scenario in enumerate(scenarios):
+        summary = _balance_summary(balances[row, :window], start, floor)
+        results.append({"name": scenario.get("name", ""), **summary, "ignored_items": ignored[row]})
+    return {
+        "days": days,
+        "floor": floor,
+        "baseline": _balance_summary(debit[:window], start, floor),
+        "scenarios": results,
+    }
+
+
+def evaluate_alerts(libraries: Dict[str, Any], alerts: List[Any], debit_floor: int = 0) -> List[Dict[str, Any]]:
+    """Check every enabled alert against one forecast."""
+    enabled = [alert for alert in alerts if alert.enabled]
+    if not enabled:
+        return []
+    window = ALERT_WINDOW_DAYS + 1
+    debit = [row["balance"] for row in libraries.get("debit_balance_forecast", [])]
+    credit = [row["balance"] for row in libraries.get("credit_balance_forecast", [])[:window]]
+    low = min(debit[:window]) if debit else 0
+    peak = max(credit) if credit else 0
+    floor_day = next((i for i, balance in enumerate(debit) if balance < debit_floor), None)
+    window_end = None
+    if debit:
+        window_end = dt.date.fromisoformat(libraries["debit_balance_forecast"][0]["date"]) + dt.timedelta(
+            days=ALERT_WINDOW_DAYS
+        )
+    upcoming = [
+        bill
+        for key in ("upcoming_debit_bills", "upcoming_credit_bills")
+        for bill in libraries.get(key, [])
+        if window_end is not None and bill["date"] <= window_end
+    ]
+
+    results = []
+    for alert in enabled:
+        if alert.type == "low_balance":
+            if low < alert.threshold:
+                results.append({"type": "low_balance", "message": "Balance below threshold", "value": low})
+        elif alert.type == "credit_ceiling":
+            if peak > alert.threshold:
+                results.append({"type": "credit_ceiling", "message": "Credit balance above ceiling", "value": peak})
+        elif alert.type == "days_until_floor":
+            if floor_day is not None and floor_day <= alert.threshold:
+                results.append(
+                    {"type": "days_until_floor", "message": "Balance drops below floor", "value": floor_day}
+                )
+        elif alert.type == "large_bill":
+            for bill in upcoming:
+                if bill["amount"] > alert.threshold:
+                    results.append(
+                        {
+                            "type": "large_bill",
+                            "message": f"{bill['name']} due {bill['date'].isoformat()}",
+                            "value": bill["amount"],
+                        }
+                    )
+    return results
+
+
+def _gap_days(later: Any, earlier: Any, dialect: str) -> Any:
+    if dialect == "sqlite":
+        return func.julianday(later) - func.julianday(earlier)
+    return later - earlier
+
+
+def _classify_gap(avg_gap: float) -> Optional[str]:
+    if 12 <= avg_gap <= 16:
+        return "Biweekly"
+    if 26 <= avg_gap <= 33:
+        return "Monthly"
+    if 6 <= avg_gap <= 8:
+        return "Weekly"
+    return None
+
+
+def _round_half_even(amount: Any) -> Any:
+    # Python's round(), which the keys have always used; SQLite's ROUND
+    # sends halves away from zero, so round exact halves to the even side.
+    is_half = (amount * 2 == func.round(amount * 2)) & (amount != func.round(amount))
+    return case((is_half, func.round(amount / 2) * 2), else_=func.round(amount))
+
+
+def detect_recurring(db: Session, user_id: int, names: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """Group transactions by (name, rounded amount) and classify their cadence in SQL."""
+    amount_key = _round_half_even(Transaction.amount)
+    group = (Transaction.name, amount_key)
+    previous = func.lag(Transaction.date).over(partition_by=group, order_by=(Transaction.date, Transaction.id))
+    recency = func.row_number().over(
+        partition_by=group, order_by=(Transaction.date.desc(), Transaction.id.desc())
+    )
+    rows = select(
+        Transaction.name,
+        amount_key.label("amount_key"),
+        Transaction.amount,
+        Transaction.date,
+        _gap_days(Transaction.date, previous, db.get_bind().dialect.name).label("gap"),
+        recency.label("recency"),
+    ).where(Transaction.user_id == user_id)
+    if names is not None:
+        rows = rows.where(Transaction.name.in_(list(names)))
+    rows = rows.subquery()
+    latest = rows.c.recency == 1
+    stmt = (
+        select(
+            rows.c.name,
+            rows.c.amount_key,
+            func.count().label("occurrences"),
+            func.avg(rows.c.gap).label("avg_gap"),
+            func.max(case((latest, rows.c.amount))).label("last_amount"),
+            func.max(case((latest, rows.c.date))).label("last_date"),
+        )
+        .group_by(rows.c.name, rows.c.amount_key)
+        .having(func.count() >= 3)
+    )
+    patterns = []
+    for row in db.execute(stmt):
+        frequency = _classify_gap(float(row.avg_gap))
+        if not frequency:
             continue
-        suggestions.append({
-            "name": items[-1].name,
-            "amount": abs(int(round(items[-1].amount))),
-            "frequency": freq,
-            "day": items[-1].date.isoformat(),
-            "type": "Debit" if items[-1].amount < 0 else "Credit",
-        })
-    return suggestions
+        last_date = row.last_date if isinstance(row.last_date, dt.date) else _as_date(row.last_date)
+        patterns.append(
+            {
+                "name": row.name,
+                "amount_key": int(row.amount_key),
+                "amount": abs(int(round(row.last_amount))),
+                "frequency": frequency,
+                "day": last_date,
+                "type": "Debit" if row.last_amount < 0 else "Credit",
+                "occurrences": int(row.occurrences),
+                "avg_gap": float(row.avg_gap),
+            }
+        )
+    return patterns
+
+
+def refresh_recurring_patterns(db: Session, user_id: int, names: Optional[Iterable[str]] = None) -> None:
+    """Recompute stored patterns for the given transaction names (all when None)."""
+    names = None if names is None else list(names)
+    stale = delete(RecurringPattern).where(RecurringPattern.user_id == user_id)
+    if names is not None:
+        if not names:
+            return
+        stale = stale.where(RecurringPattern.name.in_(names))
+    db.execute(stale)
+    patterns = detect_recurring(db, user_id, names)
+    if patterns:
+        db.execute(insert(RecurringPattern), [dict(p, user_id=user_id) for p in patterns])
+
+
+def recurring_suggestions(db: Session, user_id: int) -> List[Dict[str, Any]]:
+    rows = (
+        db.query(RecurringPattern)
+        .filter(RecurringPattern.user_id == user_id)
+        .order_by(RecurringPattern.name, RecurringPattern.amount_key)
+        .all()
+    )
+    return [
+        {
+            "name": p.name,
+            "amount": p.amount,
+            "frequency": p.frequency,
+            "day": p.day.isoformat(),
+            "type": p.type,
+        }
+        for p in rows
+    ]
@@ -1,48 +1,113 @@
-import csv
-import io
+import base64
+import functools
 import os
 import datetime as dt
 import re
-from typing import Any, Dict, List
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
 
-from authlib.integrations.starlette_client import OAuth
-from fastapi import Depends, FastAPI, File, HTTPException, Query, UploadFile
+import orjson
+from fastapi import Depends, FastAPI, File, Header, HTTPException, Query, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import Select, select, tuple_
 from sqlalchemy.orm import Session
 
-from backend.auth import create_access_token, get_current_user, get_db, hash_password, verify_password
-from backend.db import Base, engine
-from backend.logic import build_upcoming_libraries, recurring_suggestions, safe_to_spend
+from backend.auth import (
+    AuthUser,
+    create_access_token,
+    get_current_user,
+    get_db,
+    get_read_db,
+    get_read_session,
+    get_session_user,
+    hash_password_async,
+    invalidate_user,
+    password_hasher,
+    require_metrics_token,
+    run_db,
+    verify_password_async,
+)
+from backend.db import ReadSessionLocal, SessionLocal, engine
+from backend.forecast_pool import forecast_pool
+from backend.importer import import_transactions
+from backend.logic import (
+    FORECAST_HORIZON_DAYS,
+    build_upcoming_libraries,
+    compact_libraries,
+    evaluate_alerts,
+    invalidate_forecast,
+    recurring_suggestions,
+    safe_to_spend,
+    safe_to_spend_windows,
+    whatif,
+)
+from backend.migrations import run_migrations
+from backend.responses import CompressionMiddleware, FastJSONResponse
 from backend.models import (
     AlertSetting,
-    Account,
-    Bill,
     BillPayment,
-    Budget,
-    Category,
-    Income,
     Transaction,
     User,
     UserSettings,
+    WeeklySummary,
+)
+from backend.schemas import (
+    COLLECTION_SCHEMAS,
+    AuthLogin,
+    AuthRegister,
+    CSVImportResult,
+    StatePayload,
+    TokenResponse,
+    WhatIfRequest,
+)
+from backend.state import (
+    COLLECTIONS,
+    SETTINGS_FIELDS,
+    bump_version,
+    create_item,
+    delete_item,
+    load_state,
+    sync_collection,
+    update_item,
 )
-from backend.schemas import AuthLogin, AuthRegister, CSVImportResult, StatePayload, TokenResponse
+from backend.summaries import summary_range
 
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Schema work runs once per worker at startup instead of on import.
+    run_migrations(engine)
+    if forecast_pool.enabled:
+        forecast_pool.warm()
+    yield
+    forecast_pool.shutdown()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
+app.add_middleware(CompressionMiddleware)
 
-oauth = OAuth()
 google_client_id = os.environ.get("GOOGLE_CLIENT_ID")
 google_client_secret = os.environ.get("GOOGLE_CLIENT_SECRET")
-if google_client_id and google_client_secret:
+
+
+@functools.lru_cache(maxsize=None)
+def _google_oauth() -> Any:
+    """Registered authlib client, imported on first use; None if unconfigured."""
+    if not google_client_id or not google_client_secret:
+        return None
+    from authlib.integrations.starlette_client import OAuth
+
+    oauth = OAuth()
     oauth.register(
         name="google",
         client_id=google_client_id,
@@ -50,6 +115,7 @@ if google_client_id and google_client_secret:
         server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
         client_kwargs={"scope": "openid email profile"},
     )
+    return oauth
 
 
 def _ensure_settings(db: Session, user_id: int) -> UserSettings:
@@ -63,16 +129,6 @@ def _ensure_settings(db: Session, user_id: int) -> UserSettings:
     return settings
 
 
-def _ensure_user_columns() -> None:
-    with engine.connect() as conn:
-        columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(users)").fetchall()}
-        if "username" not in columns:
-            conn.exec_driver_sql("ALTER TABLE users ADD COLUMN username VARCHAR(64)")
-        indexes = {row[1] for row in conn.exec_driver_sql("PRAGMA index_list(users)").fetchall()}
-        if "ix_users_username" not in indexes:
-            conn.exec_driver_sql("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_username ON users (username)")
-
-
 def _validate_password(password: str) -> None:
     if len(password) < 8:
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters")
@@ -88,129 +144,106 @@ def _validate_password(password: str) -> None:
         raise HTTPException(status_code=400, detail="Password must include a symbol")
 
 
-_ensure_user_columns()
-
-
-def _ensure_settings_columns() -> None:
-    with engine.connect() as conn:
-        columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(user_settings)").fetchall()}
-        if "debit_floor_target" not in columns:
-            conn.exec_driver_sql("ALTER TABLE user_settings ADD COLUMN debit_floor_target INTEGER DEFAULT 0")
-        if "cc_apr_value" not in columns:
-            conn.exec_driver_sql("ALTER TABLE user_settings ADD COLUMN cc_apr_value INTEGER")
-
-
-_ensure_settings_columns()
+def _state_response(db: Session, user_id: int) -> Dict[str, Any]:
+    state = load_state(db, user_id)
+    if state is None:
+        # db may be a read-only session; create the settings row on the writer.
+        with SessionLocal() as writer:
+            _ensure_settings(writer, user_id)
+        state = load_state(db, user_id)
+    return state
+
+
+async def _state_response_async(db: Any, user_id: int) -> Dict[str, Any]:
+    state = await run_db(db, load_state, user_id)
+    if state is None:
+        with SessionLocal() as writer:
+            await run_db(writer, _ensure_settings, user_id)
+        state = await run_db(db, load_state, user_id)
+    return state
+
+
+def _registration_conflict(db: Session, username: str, email: str) -> str | None:
+    if db.query(User.id).filter(User.username == username).first():
+        return "Username already taken"
+    if db.query(User.id).filter(User.email == email).first():
+        return "Email already registered"
+    return None
+
+
+def _create_user(db: Session, email: str, username: str, password_hash: str, google_sub: str | None = None) -> int:
+    user = User(email=email, username=username, password_hash=password_hash, google_sub=google_sub)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    invalidate_user(user.id)
+    _ensure_settings(db, user.id)
+    return user.id
 
 
-def _state_response(db: Session, user_id: int) -> Dict[str, Any]:
-    settings = _ensure_settings(db, user_id)
-    bills = db.query(Bill).filter(Bill.user_id == user_id).all()
-    income = db.query(Income).filter(Income.user_id == user_id).all()
-    categories = db.query(Category).filter(Category.user_id == user_id).all()
-    budgets = db.query(Budget).filter(Budget.user_id == user_id).all()
-    alerts = db.query(AlertSetting).filter(AlertSetting.user_id == user_id).all()
-    accounts = db.query(Account).filter(Account.user_id == user_id).all()
-    return {
-        "debit_balance": settings.debit_balance,
-        "credit_balance": settings.credit_balance,
-        "cc_pay_day": settings.cc_pay_day,
-        "cc_pay_method_value": settings.cc_pay_method_value,
-        "cc_pay_amount_value": settings.cc_pay_amount_value,
-        "cc_pay_amount_unit_value": settings.cc_pay_amount_unit_value,
-        "cc_apr_value": settings.cc_apr_value,
-        "cashflow_days": settings.cashflow_days,
-        "cashflow_view_filter": settings.cashflow_view_filter,
-        "graph_view_type": settings.graph_view_type,
-        "graph_end_date": settings.graph_end_date,
-        "safe_to_spend_days": settings.safe_to_spend_days,
-        "debit_floor_target": settings.debit_floor_target,
-        "bills": [
-            {
-                "id": b.id,
-                "name": b.name,
-                "amount": b.amount,
-                "frequency": b.frequency,
-                "day": b.day,
-                "type": b.type,
-            }
-            for b in bills
-        ],
-        "income": [
-            {
-                "id": i.id,
-                "name": i.name,
-                "amount": i.amount,
-                "frequency": i.frequency,
-                "day": i.day,
-            }
-            for i in income
-        ],
-        "categories": [
-            {"id": c.id, "name": c.name, "type": c.type} for c in categories
-        ],
-        "budgets": [
-            {"id": b.id, "category_id": b.category_id, "amount": b.amount, "period": b.period}
-            for b in budgets
-        ],
-        "alerts": [
-            {"id": a.id, "type": a.type, "threshold": a.threshold, "enabled": a.enabled}
-            for a in alerts
-        ],
-        "accounts": [
-            {"id": a.id, "name": a.name, "type": a.type, "balance": a.balance}
-            for a in accounts
-        ],
-    }
+def _login_record(db: Session, email: str) -> Tuple[int, str] | None:
+    return db.query(User.id, User.password_hash).filter(User.email == email).first()
 
 
 @app.post("/api/auth/register", response_model=TokenResponse)
-def register(payload: AuthRegister, db: Session = Depends(get_db)) -> TokenResponse:
+async def register(payload: AuthRegister, db: Session = Depends(get_db)) -> TokenResponse:
     if not payload.username or not payload.username.strip():
         raise HTTPException(status_code=400, detail="Username is required")
     if payload.password != payload.confirm_password:
         raise HTTPException(status_code=400, detail="Passwords do not match")
     _validate_password(payload.password)
-    if db.query(User).filter(User.username == payload.username).first():
-        raise HTTPException(status_code=400, detail="Username already taken")
-    if db.query(User).filter(User.email == payload.email).first():
-        raise HTTPException(status_code=400, detail="Email already registered")
-    user = User(
-        email=payload.email,
-        username=payload.username,
-        password_hash=hash_password(payload.password),
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    _ensure_settings(db, user.id)
-    return TokenResponse(access_token=create_access_token(user.id))
+    conflict = await run_db(db, _registration_conflict, payload.username, payload.email)
+    if conflict:
+        raise HTTPException(status_code=400, detail=conflict)
+    password_hash = await hash_password_async(payload.password)
+    user_id = await run_db(db, _create_user, payload.email, payload.username, password_hash)
+    return TokenResponse(access_token=create_access_token(user_id))
 
 
 @app.post("/api/auth/login", response_model=TokenResponse)
-def login(payload: AuthLogin, db: Session = Depends(get_db)) -> TokenResponse:
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: AuthLogin, db: Session = Depends(get_db)) -> TokenResponse:
+    record = await run_db(db, _login_record, payload.email)
+    if not record or not await verify_password_async(payload.password, record[1]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    return TokenResponse(access_token=create_access_token(user.id))
+    return TokenResponse(access_token=create_access_token(record[0]))
+
+
+@app.get("/api/metrics/auth", dependencies=[Depends(require_metrics_token)])
+def auth_metrics() -> Dict[str, Any]:
+    return password_hasher.metrics()
 
 
 @app.get("/api/auth/me")
-def me(user: User = Depends(get_current_user)) -> Dict[str, Any]:
+def me(user: AuthUser = Depends(get_current_user)) -> Dict[str, Any]:
     return {"id": user.id, "email": user.email, "username": user.username}
 
 
 @app.get("/api/auth/google/start")
 async def google_start():
-    if not google_client_id or not google_client_secret:
+    oauth = _google_oauth()
+    if oauth is None:
         raise HTTPException(status_code=501, detail="Google OAuth not configured")
     redirect_uri = os.environ.get("GOOGLE_REDIRECT_URI", "http://localhost:8000/api/auth/google/callback")
     return await oauth.google.authorize_redirect(redirect_uri)
 
 
+def _google_user_id(db: Session, email: str) -> int | None:
+    user = db.query(User.id).filter(User.email == email).first()
+    return user.id if user else None
+
+
+def _create_google_user(db: Session, email: str, sub: str, password_hash: str) -> int:
+    base_username = (email or "").split("@")[0] or f"user_{sub[:8]}"
+    candidate = base_username
+    if db.query(User.id).filter(User.username == candidate).first():
+        candidate = f"{base_username}_{sub[:6]}"
+    return _create_user(db, email, candidate, password_hash, google_sub=sub)
+
+
 @app.get("/api/auth/google/callback")
 async def google_callback(db: Session = Depends(get_db)):
-    if not google_client_id or not google_client_secret:
+    oauth = _google_oauth()
+    if oauth is None:
         raise HTTPException(status_code=501, detail="Google OAuth not configured")
     token = await oauth.google.authorize_access_token()
     user_info = token.get("userinfo")
@@ -218,160 +251,218 @@ async def google_callback(db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail="Google login failed")
     email = user_info.get("email")
     sub = user_info.get("sub")
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        base_username = (email or "").split("@")[0] or f"user_{sub[:8]}"
-        candidate = base_username
-        if db.query(User).filter(User.username == candidate).first():
-            candidate = f"{base_username}_{sub[:6]}"
-        user = User(
-            email=email,
-            username=candidate,
-            password_hash=hash_password(os.urandom(16).hex()),
-            google_sub=sub,
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        _ensure_settings(db, user.id)
-    return TokenResponse(access_token=create_access_token(user.id))
+    user_id = await run_db(db, _google_user_id, email)
+    if user_id is None:
+        password_hash = await hash_password_async(os.urandom(16).hex())
+        user_id = await run_db(db, _create_google_user, email, sub, password_hash)
+    return TokenResponse(access_token=create_access_token(user_id))
+
+
+def _expected_version(if_match: str | None) -> int | None:
+    if not if_match or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid If-Match header")
+
+
+def _begin_write(db: Session, user_id: int, if_match: str | None) -> Tuple[UserSettings, int]:
+    settings = _ensure_settings(db, user_id)
+    version = bump_version(db, user_id, _expected_version(if_match))
+    if version is None:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="State was modified by another request")
+    return settings, version
 
 
-@app.get("/api/state")
-def get_state(
-    db: Session = Depends(get_db), user: User = Depends(get_current_user)
-) -> Dict[str, Any]:
-    return _state_response(db, user.id)
+def _etag(state: Dict[str, Any]) -> str:
+    return f'"{state["version"]}"'
+
+
+def _versioned(response: Response, state: Dict[str, Any]) -> Dict[str, Any]:
+    response.headers["ETag"] = _etag(state)
+    return state
+
+
+@app.get("/api/state", response_class=FastJSONResponse)
+async def get_state(
+    db: Any = Depends(get_read_session), user: AuthUser = Depends(get_session_user)
+) -> FastJSONResponse:
+    state = await _state_response_async(db, user.id)
+    return FastJSONResponse(state, headers={"ETag": _etag(state)})
 
 
 @app.put("/api/state")
 def put_state(
     payload: StatePayload,
+    response: Response,
+    if_match: str | None = Header(None),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: AuthUser = Depends(get_current_user),
 ) -> Dict[str, Any]:
-    settings = _ensure_settings(db, user.id)
+    settings, _ = _begin_write(db, user.id, if_match)
     data = payload.dict(exclude_unset=True)
-    for key in [
-        "debit_balance",
-        "credit_balance",
-        "cc_pay_day",
-        "cc_pay_method_value",
-        "cc_pay_amount_value",
-        "cc_pay_amount_unit_value",
-        "cc_apr_value",
-        "cashflow_days",
-        "cashflow_view_filter",
-        "graph_view_type",
-        "graph_end_date",
-        "safe_to_spend_days",
-        "debit_floor_target",
-    ]:
+    for key in SETTINGS_FIELDS:
         if key in data:
             setattr(settings, key, data[key])
+    for key in COLLECTIONS:
+        if data.get(key) is not None:
+            sync_collection(db, key, user.id, data[key])
+    db.commit()
+    invalidate_forecast(user.id)
+    return _versioned(response, _state_response(db, user.id))
 
-    if data.get("bills") is not None:
-        db.query(Bill).filter(Bill.user_id == user.id).delete()
-        for item in data["bills"]:
-            db.add(
-                Bill(
-                    user_id=user.id,
-                    name=item.get("name", ""),
-                    amount=int(item.get("amount", 0)),
-                    frequency=item.get("frequency", ""),
-                    day=str(item.get("day", "")),
-                    type=item.get("type", "Debit"),
-                )
-            )
-
-    if data.get("income") is not None:
-        db.query(Income).filter(Income.user_id == user.id).delete()
-        for item in data["income"]:
-            db.add(
-                Income(
-                    user_id=user.id,
-                    name=item.get("name", ""),
-                    amount=int(item.get("amount", 0)),
-                    frequency=item.get("frequency", ""),
-                    day=str(item.get("day", "")),
-                )
-            )
-
-    if data.get("categories") is not None:
-        db.query(Category).filter(Category.user_id == user.id).delete()
-        for item in data["categories"]:
-            db.add(
-                Category(
-                    user_id=user.id,
-                    name=item.get("name", ""),
-                    type=item.get("type", "Expense"),
-                )
-            )
-
-    if data.get("budgets") is not None:
-        db.query(Budget).filter(Budget.user_id == user.id).delete()
-        for item in data["budgets"]:
-            db.add(
-                Budget(
-                    user_id=user.id,
-                    category_id=int(item.get("category_id", 0)),
-                    amount=int(item.get("amount", 0)),
-                    period=item.get("period", "Monthly"),
-                )
-            )
-
-    if data.get("alerts") is not None:
-        db.query(AlertSetting).filter(AlertSetting.user_id == user.id).delete()
-        for item in data["alerts"]:
-            db.add(
-                AlertSetting(
-                    user_id=user.id,
-                    type=item.get("type", "low_balance"),
-                    threshold=int(item.get("threshold", 0)),
-                    enabled=bool(item.get("enabled", True)),
-                )
-            )
-
-    if data.get("accounts") is not None:
-        db.query(Account).filter(Account.user_id == user.id).delete()
-        for item in data["accounts"]:
-            db.add(
-                Account(
-                    user_id=user.id,
-                    name=item.get("name", ""),
-                    type=item.get("type", "Checking"),
-                    balance=int(item.get("balance", 0)),
-                )
-            )
 
-    db.commit()
-    return _state_response(db, user.id)
+# Collections whose rows feed the forecast.
+FORECAST_COLLECTIONS = {"bills", "income"}
 
 
-@app.get("/api/libraries")
-def get_libraries(
+def _add_collection_routes(key: str) -> None:
+    create_schema, update_schema = COLLECTION_SCHEMAS[key]
+
+    def _finish(db: Session, user_id: int, response: Response, version: int, body: Dict[str, Any]) -> Dict[str, Any]:
+        db.commit()
+        if key in FORECAST_COLLECTIONS:
+            invalidate_forecast(user_id)
+        response.headers["ETag"] = f'"{version}"'
+        return {**body, "version": version}
+
+    def create(
+        payload: create_schema,
+        response: Response,
+        if_match: str | None = Header(None),
+        db: Session = Depends(get_db),
+        user: AuthUser = Depends(get_current_user),
+    ) -> Dict[str, Any]:
+        _, version = _begin_write(db, user.id, if_match)
+        item = create_item(db, key, user.id, payload.model_dump())
+        return _finish(db, user.id, response, version, {"item": item})
+
+    def patch(
+        item_id: int,
+        payload: update_schema,
+        response: Response,
+        if_match: str | None = Header(None),
+        db: Session = Depends(get_db),
+        user: AuthUser = Depends(get_current_user),
+    ) -> Dict[str, Any]:
+        _, version = _begin_write(db, user.id, if_match)
+        item = update_item(db, key, user.id, item_id, payload.model_dump(exclude_unset=True))
+        if item is None:
+            db.rollback()
+            raise HTTPException(status_code=404, detail="Not found")
+        return _finish(db, user.id, response, version, {"item": item})
+
+    def remove(
+        item_id: int,
+        response: Response,
+        if_match: str | None = Header(None),
+        db: Session = Depends(get_db),
+        user: AuthUser = Depends(get_current_user),
+    ) -> Dict[str, Any]:
+        _, version = _begin_write(db, user.id, if_match)
+        if not delete_item(db, key, user.id, item_id):
+            db.rollback()
+            raise HTTPException(status_code=404, detail="Not found")
+        return _finish(db, user.id, response, version, {"deleted": item_id})
+
+    app.add_api_route(f"/api/{key}", create, methods=["POST"])
+    app.add_api_route(f"/api/{key}/{{item_id}}", patch, methods=["PATCH"])
+    app.add_api_route(f"/api/{key}/{{item_id}}", remove, methods=["DELETE"])
+
+
+for _collection in COLLECTION_SCHEMAS:
+    _add_collection_routes(_collection)
+
+
+async def _build_libraries(db: Session, user_id: int, days: int) -> Dict[str, Any]:
+    if forecast_pool.enabled:
+        return await forecast_pool.build_libraries(db, user_id, days)
+    return await run_in_threadpool(build_upcoming_libraries, db, user_id, days)
+
+
+@app.get("/api/libraries", response_class=FastJSONResponse)
+async def get_libraries(
     days: int = Query(1825, ge=1, le=1825),
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> Dict[str, Any]:
-    return build_upcoming_libraries(db, user.id, days=days)
+    format: str = Query("full", pattern="^(full|compact)$"),
+    db: Session = Depends(get_read_db),
+    user: AuthUser = Depends(get_current_user),
+) -> FastJSONResponse:
+    libraries = await _build_libraries(db, user.id, days)
+    if format == "compact":
+        return FastJSONResponse(compact_libraries(libraries, dt.date.today()))
+    return FastJSONResponse(libraries)
+
+
+@app.get("/api/metrics/forecast", dependencies=[Depends(require_metrics_token)])
+def forecast_metrics() -> Dict[str, Any]:
+    return forecast_pool.metrics()
 
 
 @app.get("/api/safe_to_spend")
 def get_safe_to_spend(
-    days: int | None = None,
+    days: int | None = Query(None, ge=1, le=1825),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: AuthUser = Depends(get_current_user),
 ) -> Dict[str, Any]:
     settings = _ensure_settings(db, user.id)
     window = days or settings.safe_to_spend_days or 14
     return {"safe_to_spend": safe_to_spend(db, user.id, window), "days": window}
 
 
+SAFE_TO_SPEND_MAX_WINDOWS = 32
+
+
+def _parse_windows(windows: str) -> List[Tuple[int, int]]:
+    """Parse "7,14,30" into [(0, 7), (0, 14), (0, 30)]; "start:end" picks a later range."""
+    parsed = []
+    for token in filter(None, (part.strip() for part in windows.split(","))):
+        start, sep, end = token.rpartition(":")
+        try:
+            window = (int(start) if sep else 0, int(end))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid window: {token}")
+        if not 0 <= window[0] <= window[1] <= FORECAST_HORIZON_DAYS:
+            raise HTTPException(status_code=400, detail=f"Window out of range: {token}")
+        parsed.append(window)
+    if not parsed or len(parsed) > SAFE_TO_SPEND_MAX_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"Pass 1 to {SAFE_TO_SPEND_MAX_WINDOWS} windows")
+    return parsed
+
+
+@app.get("/api/safe_to_spend/batch")
+def get_safe_to_spend_batch(
+    windows: str = Query(..., description="Comma-separated day counts or start:end day offsets"),
+    db: Session = Depends(get_read_db),
+    user: AuthUser = Depends(get_current_user),
+) -> Dict[str, Any]:
+    parsed = _parse_windows(windows)
+    values = safe_to_spend_windows(db, user.id, parsed)
+    return {
+        "windows": [
+            {"start": start, "end": end, "safe_to_spend": value} for (start, end), value in zip(parsed, values)
+        ]
+    }
+
+
+@app.post("/api/whatif")
+def post_whatif(
+    payload: WhatIfRequest,
+    db: Session = Depends(get_read_db),
+    user: AuthUser = Depends(get_current_user),
+) -> Dict[str, Any]:
+    scenarios = [scenario.model_dump() for scenario in payload.scenarios]
+    return whatif(db, user.id, scenarios, payload.days, payload.floor)
+
+
 @app.get("/api/recurring/suggest")
 def get_recurring_suggestions(
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    user: AuthUser = Depends(get_current_user),
 ) -> List[Dict[str, Any]]:
     return recurring_suggestions(db, user.id)
 
@@ -380,107 +471,143 @@ def get_recurring_suggestions(
 def import_csv(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: AuthUser = Depends(get_current_user),
 ) -> CSVImportResult:
-    content = file.file.read().decode("utf-8", errors="ignore")
-    reader = csv.DictReader(io.StringIO(content))
-    imported = 0
-    skipped = 0
-    for row in reader:
-        date_value = row.get("date") or row.get("Date")
-        name = row.get("name") or row.get("description") or row.get("Description") or ""
-        amount_value = row.get("amount") or row.get("Amount")
-        if not date_value or amount_value is None:
-            skipped += 1
-            continue
-        try:
-            date = dt.datetime.fromisoformat(date_value).date()
-        except Exception:
-            try:
-                date = dt.datetime.strptime(date_value, "%m/%d/%Y").date()
-            except Exception:
-                skipped += 1
-                continue
-        try:
-            amount = float(amount_value)
-        except Exception:
-            skipped += 1
-            continue
-        tx = Transaction(
-            user_id=user.id,
-            date=date,
-            name=name,
-            amount=amount,
-            type="Debit" if amount < 0 else "Credit",
-            source="csv",
-        )
-        db.add(tx)
-        imported += 1
-    db.commit()
-    return CSVImportResult(imported=imported, skipped=skipped)
+    imported, skipped, duplicates = import_transactions(db, user.id, file.file)
+    return CSVImportResult(imported=imported, skipped=skipped, duplicates=duplicates)
+
+
+TRANSACTION_COLUMNS = (
+    Transaction.id,
+    Transaction.date,
+    Transaction.name,
+    Transaction.amount,
+    Transaction.type,
+    Transaction.category_id,
+    Transaction.source,
+)
+TRANSACTION_STREAM_BATCH = 500
+
+
+def _encode_cursor(date: dt.date, tx_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{date.isoformat()}|{tx_id}".encode("utf-8")).decode("ascii")
 
 
-@app.get("/api/transactions")
-def get_transactions(
+def _decode_cursor(cursor: str) -> Tuple[dt.date, int]:
+    try:
+        date_value, tx_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return dt.date.fromisoformat(date_value), int(tx_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _transaction_row(row: Any) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "date": row.date.isoformat(),
+        "name": row.name,
+        "amount": row.amount,
+        "type": row.type,
+        "category_id": row.category_id,
+        "source": row.source,
+    }
+
+
+def _stream_transactions(stmt: Select) -> Iterator[bytes]:
+    # The request's session is closed once the endpoint returns, so the
+    # stream reads through its own.
+    db = ReadSessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=TRANSACTION_STREAM_BATCH))
+        for rows in result.partitions():
+            yield b"".join(orjson.dumps(_transaction_row(row)) + b"\n" for row in rows)
+    finally:
+        db.close()
+
+
+def _fetch_rows(db: Session, stmt: Select) -> List[Any]:
+    return db.execute(stmt).all()
+
+
+@app.get("/api/transactions", response_class=FastJSONResponse)
+async def get_transactions(
     start: str | None = None,
     end: str | None = None,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> List[Dict[str, Any]]:
-    query = db.query(Transaction).filter(Transaction.user_id == user.id)
+    limit: int | None = Query(None, ge=1, le=1000),
+    after: str | None = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Any = Depends(get_read_session),
+    user: AuthUser = Depends(get_session_user),
+) -> Any:
+    stmt = select(*TRANSACTION_COLUMNS).where(Transaction.user_id == user.id)
     if start:
-        query = query.filter(Transaction.date >= dt.datetime.fromisoformat(start).date())
+        stmt = stmt.where(Transaction.date >= dt.datetime.fromisoformat(start).date())
     if end:
-        query = query.filter(Transaction.date <= dt.datetime.fromisoformat(end).date())
-    return [
-        {
-            "id": t.id,
-            "date": t.date.isoformat(),
-            "name": t.name,
-            "amount": t.amount,
-            "type": t.type,
-            "category_id": t.category_id,
-            "source": t.source,
-        }
-        for t in query.all()
-    ]
-
-
-@app.get("/api/checklist")
-def get_checklist(
+        stmt = stmt.where(Transaction.date <= dt.datetime.fromisoformat(end).date())
+    if after:
+        stmt = stmt.where(tuple_(Transaction.date, Transaction.id) > tuple_(*_decode_cursor(after)))
+    stmt = stmt.order_by(Transaction.date, Transaction.id)
+    if limit:
+        stmt = stmt.limit(limit)
+    if format == "ndjson":
+        return StreamingResponse(_stream_transactions(stmt), media_type="application/x-ndjson")
+    rows = await run_db(db, _fetch_rows, stmt)
+    headers = {}
+    if limit and len(rows) == limit:
+        headers["X-Next-Cursor"] = _encode_cursor(rows[-1].date, rows[-1].id)
+    return FastJSONResponse([_transaction_row(row) for row in rows], headers=headers)
+
+
+def _checklist_payments(db: Session, user_id: int, bills: List[Dict[str, Any]]) -> Dict[tuple, bool]:
+    rows = (
+        db.query(BillPayment.bill_name, BillPayment.due_date, BillPayment.paid)
+        .filter(
+            BillPayment.user_id == user_id,
+            BillPayment.due_date >= min(bill["date"] for bill in bills),
+            BillPayment.due_date <= max(bill["date"] for bill in bills),
+        )
+        .order_by(BillPayment.id)
+        .all()
+    )
+    paid: Dict[tuple, bool] = {}
+    for bill_name, due_date, is_paid in rows:
+        paid.setdefault((bill_name, due_date), bool(is_paid))
+    return paid
+
+
+@app.get("/api/checklist", response_class=FastJSONResponse)
+async def get_checklist(
     days: int = Query(30, ge=1, le=1825),
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> List[Dict[str, Any]]:
-    libraries = build_upcoming_libraries(db, user.id, days=days)
+    db: Any = Depends(get_read_session),
+    user: AuthUser = Depends(get_session_user),
+) -> FastJSONResponse:
+    if isinstance(db, Session):
+        libraries = await _build_libraries(db, user.id, days)
+    else:
+        # run_sync would simulate on the event loop; use a sync session off it.
+        with ReadSessionLocal() as reader:
+            libraries = await _build_libraries(reader, user.id, days)
+    bills = libraries.get("upcoming_debit_bills", [])
+    paid = await run_db(db, _checklist_payments, user.id, bills) if bills else {}
     items = []
-    for bill in libraries.get("upcoming_debit_bills", []):
+    for bill in bills:
         due = bill["date"]
-        payment = (
-            db.query(BillPayment)
-            .filter(
-                BillPayment.user_id == user.id,
-                BillPayment.bill_name == bill.get("name", ""),
-                BillPayment.due_date == due,
-            )
-            .first()
-        )
         items.append(
             {
                 "bill_name": bill.get("name", ""),
                 "due_date": due.isoformat() if hasattr(due, "isoformat") else str(due),
                 "amount": bill.get("amount", 0),
-                "paid": bool(payment.paid) if payment else False,
+                "paid": paid.get((bill.get("name", ""), due), False),
             }
         )
-    return items
+    return FastJSONResponse(items)
 
 
 @app.post("/api/checklist/mark")
 def mark_checklist(
     payload: Dict[str, Any],
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: AuthUser = Depends(get_current_user),
 ) -> Dict[str, Any]:
     bill_name = payload.get("bill_name", "")
     due_date = payload.get("due_date")
@@ -509,25 +636,37 @@ def mark_checklist(
 @app.get("/api/alerts")
 def get_alerts(
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: AuthUser = Depends(get_current_user),
 ) -> List[Dict[str, Any]]:
     alerts = db.query(AlertSetting).filter(AlertSetting.user_id == user.id).all()
-    results = []
-    for alert in alerts:
-        if alert.type == "low_balance":
-            current = safe_to_spend(db, user.id, 14)
-            if alert.enabled and current < alert.threshold:
-                results.append(
-                    {"type": "low_balance", "message": "Balance below threshold", "value": current}
-                )
-    return results
+    if not any(alert.enabled for alert in alerts):
+        return []
+    settings = _ensure_settings(db, user.id)
+    libraries = build_upcoming_libraries(db, user.id)
+    return evaluate_alerts(libraries, alerts, int(settings.debit_floor_target or 0))
+
+
+def _week_totals(db: Session, user_id: int, start_date: dt.date, end_date: dt.date) -> Tuple[float, float]:
+    if start_date.weekday() == 0:
+        row = (
+            db.query(WeeklySummary.total_income, WeeklySummary.total_spend)
+            .filter(WeeklySummary.user_id == user_id, WeeklySummary.week_start == start_date)
+            .first()
+        )
+        return tuple(row) if row else (0.0, 0.0)
+    txs = (
+        db.query(Transaction.amount)
+        .filter(Transaction.user_id == user_id, Transaction.date >= start_date, Transaction.date <= end_date)
+        .all()
+    )
+    return sum(t.amount for t in txs if t.amount > 0), sum(abs(t.amount) for t in txs if t.amount < 0)
 
 
 @app.get("/api/summary/weekly")
-def weekly_summary(
+async def weekly_summary(
     start: str | None = None,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: Any = Depends(get_read_session),
+    user: AuthUser = Depends(get_session_user),
 ) -> Dict[str, Any]:
     if start:
         start_date = dt.datetime.fromisoformat(start).date()
@@ -535,13 +674,7 @@ def weekly_summary(
         today = dt.date.today()
         start_date = today - dt.timedelta(days=today.weekday())
     end_date = start_date + dt.timedelta(days=6)
-    txs = (
-        db.query(Transaction)
-        .filter(Transaction.user_id == user.id, Transaction.date >= start_date, Transaction.date <= end_date)
-        .all()
-    )
-    income = sum(t.amount for t in txs if t.amount > 0)
-    spend = sum(abs(t.amount) for t in txs if t.amount < 0)
+    income, spend = await run_db(db, _week_totals, user.id, start_date, end_date)
     return {
         "week_start": start_date.isoformat(),
         "week_end": end_date.isoformat(),
@@ -550,10 +683,26 @@ def weekly_summary(
     }
 
 
+@app.get("/api/summary/range")
+async def summary_totals(
+    period: str = Query("weekly", pattern="^(weekly|monthly)$"),
+    start: str | None = None,
+    end: str | None = None,
+    db: Any = Depends(get_read_session),
+    user: AuthUser = Depends(get_session_user),
+) -> List[Dict[str, Any]]:
+    end_date = dt.datetime.fromisoformat(end).date() if end else dt.date.today()
+    if start:
+        start_date = dt.datetime.fromisoformat(start).date()
+    else:
+        start_date = end_date - dt.timedelta(days=365)
+    return await run_db(db, summary_range, user.id, period, start_date, end_date)
+
+
 @app.get("/api/export")
 def export_backup(
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    user: AuthUser = Depends(get_current_user),
 ) -> Dict[str, Any]:
     return _state_response(db, user.id)
 
@@ -561,12 +710,15 @@ def export_backup(
 @app.post("/api/backup/upload")
 def upload_backup(
     payload: Dict[str, Any],
+    response: Response,
+    if_match: str | None = Header(None),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: AuthUser = Depends(get_current_user),
 ) -> Dict[str, Any]:
-    settings = _ensure_settings(db, user.id)
+    settings, _ = _begin_write(db, user.id, if_match)
     for key, value in payload.items():
-        if hasattr(settings, key):
+        if key in SETTINGS_FIELDS:
             setattr(settings, key, value)
     db.commit()
-    return _state_response(db, user.id)
+    invalidate_forecast(user.id)
+    return _versioned(response, _state_response(db, user.id))
@@ -0,0 +1,297 @@
+"""Numbered schema migrations tracked in a one-row schema_version table.
+
+Each step uses its own frozen table definitions, so later model changes cannot alter it.
+"""
+
+import datetime as dt
+import hashlib
+import itertools
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    case,
+    delete,
+    func,
+    insert,
+    inspect,
+    select,
+    update,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from backend import models  # noqa: F401  (fresh databases are created from the models)
+from backend.db import Base
+
+version_metadata = MetaData()
+schema_version = Table("schema_version", version_metadata, Column("version", Integer, nullable=False))
+
+BATCH_SIZE = 1000
+
+frozen = MetaData()
+users = Table(
+    "users",
+    frozen,
+    Column("id", Integer, primary_key=True),
+    Column("username", String(64)),
+)
+user_settings = Table(
+    "user_settings",
+    frozen,
+    Column("id", Integer, primary_key=True),
+    Column("debit_floor_target", Integer),
+    Column("cc_apr_value", Integer),
+    Column("version", Integer),
+)
+transactions = Table(
+    "transactions",
+    frozen,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer),
+    Column("date", Date),
+    Column("name", String(255)),
+    Column("amount", Float),
+    Column("fingerprint", String(40)),
+)
+weekly_summaries = Table(
+    "weekly_summaries",
+    frozen,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer),
+    Column("week_start", Date),
+    Column("total_income", Float),
+    Column("total_spend", Float),
+    Column("created_at", DateTime),
+)
+monthly_summaries = Table(
+    "monthly_summaries",
+    frozen,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", ForeignKey("users.id"), nullable=False, index=True),
+    Column("month_start", Date, nullable=False),
+    Column("total_income", Float, nullable=False),
+    Column("total_spend", Float, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("ix_monthly_summaries_user_month", "user_id", "month_start", unique=True),
+)
+recurring_patterns = Table(
+    "recurring_patterns",
+    frozen,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", ForeignKey("users.id"), nullable=False, index=True),
+    Column("name", String(255), nullable=False),
+    Column("amount_key", Integer, nullable=False),
+    Column("amount", Integer, nullable=False),
+    Column("frequency", String(32), nullable=False),
+    Column("day", Date, nullable=False),
+    Column("type", String(16), nullable=False),
+    Column("occurrences", Integer, nullable=False),
+    Column("avg_gap", Float, nullable=False),
+    Index("ix_recurring_patterns_user_key", "user_id", "name", "amount_key", unique=True),
+)
+
+
+def _add_column(conn: Connection, column: Any, default: Optional[str] = None) -> None:
+    table = column.table.name
+    if column.name in {col["name"] for col in inspect(conn).get_columns(table)}:
+        return
+    ddl = f"ALTER TABLE {table} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}"
+    if default is not None:
+        ddl += f" DEFAULT {default}"
+    conn.exec_driver_sql(ddl)
+
+
+def _add_index(conn: Connection, name: str, table: str, columns: str, unique: bool = False) -> None:
+    if name in {index["name"] for index in inspect(conn).get_indexes(table)}:
+        return
+    conn.exec_driver_sql(f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} ({columns})")
+
+
+def _users_username(conn: Connection) -> None:
+    _add_column(conn, users.c.username)
+    _add_index(conn, "ix_users_username", "users", "username", unique=True)
+
+
+def _settings_floor_and_apr(conn: Connection) -> None:
+    _add_column(conn, user_settings.c.debit_floor_target, default="0")
+    _add_column(conn, user_settings.c.cc_apr_value)
+
+
+def _settings_version(conn: Connection) -> None:
+    _add_column(conn, user_settings.c.version, default="0")
+
+
+def _fingerprint(user_id: int, date: dt.date, name: str, amount: float, seen: Dict[Tuple, int]) -> str:
+    key = (user_id, date, " ".join(str(name or "").lower().split()), int(round(amount * 100)))
+    ordinal = seen.get(key, 0)
+    seen[key] = ordinal + 1
+    raw = f"{user_id}|{date.isoformat()}|{key[2]}|{key[3]}|{ordinal}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _transaction_fingerprints(conn: Connection) -> None:
+    _add_column(conn, transactions.c.fingerprint)
+    _add_index(conn, "ix_transactions_fingerprint", "transactions", "fingerprint", unique=True)
+    t = transactions
+    result = conn.execution_options(yield_per=BATCH_SIZE).execute(
+        select(t.c.id, t.c.user_id, t.c.date, t.c.name, t.c.amount)
+        .where(t.c.fingerprint.is_(None))
+        .order_by(t.c.user_id, t.c.id)
+    )
+    seen: Dict[Tuple, int] = {}
+    stmt = update(t).where(t.c.id == bindparam("tx_id")).values(fingerprint=bindparam("fp"))
+    for rows in result.partitions():
+        conn.execute(
+            stmt,
+            [
+                {"tx_id": tx_id, "fp": _fingerprint(user_id, date, name, amount, seen)}
+                for tx_id, user_id, date, name, amount in rows
+            ],
+        )
+
+
+def _query_indexes(conn: Connection) -> None:
+    _add_index(conn, "ix_bill_payments_user_due_name", "bill_payments", "user_id, due_date, bill_name")
+    _add_index(conn, "ix_transactions_user_date_id", "transactions", "user_id, date, id")
+    _add_index(conn, "ix_weekly_summaries_user_week", "weekly_summaries", "user_id, week_start", unique=True)
+
+
+def _summary_rollups(conn: Connection) -> None:
+    # Rollups were never written before they were maintained on import.
+    monthly_summaries.create(conn, checkfirst=True)
+    weekly: Dict[Tuple[int, dt.date], List[float]] = {}
+    monthly: Dict[Tuple[int, dt.date], List[float]] = {}
+    t = transactions
+    result = conn.execution_options(yield_per=BATCH_SIZE).execute(select(t.c.user_id, t.c.date, t.c.amount))
+    for user_id, date, amount in result:
+        for totals, start in (
+            (weekly, date - dt.timedelta(days=date.weekday())),
+            (monthly, date.replace(day=1)),
+        ):
+            bucket = totals.setdefault((user_id, start), [0.0, 0.0])
+            if amount > 0:
+                bucket[0] += amount
+            elif amount < 0:
+                bucket[1] += abs(amount)
+    now = dt.datetime.utcnow()
+    for table, column, totals in (
+        (weekly_summaries, "week_start", weekly),
+        (monthly_summaries, "month_start", monthly),
+    ):
+        conn.execute(delete(table))
+        rows = [
+            {"user_id": user_id, column: start, "total_income": income, "total_spend": spend, "created_at": now}
+            for (user_id, start), (income, spend) in totals.items()
+        ]
+        if rows:
+            conn.execute(insert(table), rows)
+
+
+def _classify_gap(avg_gap: float) -> Optional[str]:
+    if 12 <= avg_gap <= 16:
+        return "Biweekly"
+    if 26 <= avg_gap <= 33:
+        return "Monthly"
+    if 6 <= avg_gap <= 8:
+        return "Weekly"
+    return None
+
+
+def _pattern(user_id: int, name: str, amount_key: float, group: List[Any]) -> Optional[Dict[str, Any]]:
+    if len(group) < 3:
+        return None
+    avg_gap = sum((later.date - earlier.date).days for earlier, later in zip(group, group[1:])) / (len(group) - 1)
+    frequency = _classify_gap(avg_gap)
+    if not frequency:
+        return None
+    last = group[-1]
+    return {
+        "user_id": user_id,
+        "name": name,
+        "amount_key": int(amount_key),
+        "amount": abs(int(round(last.amount))),
+        "frequency": frequency,
+        "day": last.date,
+        "type": "Debit" if last.amount < 0 else "Credit",
+        "occurrences": len(group),
+        "avg_gap": float(avg_gap),
+    }
+
+
+def _round_half_even(amount: Any) -> Any:
+    is_half = (amount * 2 == func.round(amount * 2)) & (amount != func.round(amount))
+    return case((is_half, func.round(amount / 2) * 2), else_=func.round(amount))
+
+
+def _recurring_patterns(conn: Connection) -> None:
+    recurring_patterns.create(conn, checkfirst=True)
+    conn.execute(delete(recurring_patterns))
+    t = transactions
+    amount_key = _round_half_even(t.c.amount).label("amount_key")
+    result = conn.execution_options(yield_per=BATCH_SIZE).execute(
+        select(t.c.user_id, t.c.name, amount_key, t.c.date, t.c.amount).order_by(
+            t.c.user_id, t.c.name, amount_key, t.c.date, t.c.id
+        )
+    )
+    groups = itertools.groupby(result, key=lambda row: (row.user_id, row.name, row.amount_key))
+    found = [pattern for pattern in (_pattern(*key, list(group)) for key, group in groups) if pattern]
+    if found:
+        conn.execute(insert(recurring_patterns), found)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "users.username", _users_username),
+    (2, "user_settings.debit_floor_target and cc_apr_value", _settings_floor_and_apr),
+    (3, "user_settings.version", _settings_version),
+    (4, "transactions.fingerprint", _transaction_fingerprints),
+    (5, "query indexes", _query_indexes),
+    (6, "weekly and monthly rollups", _summary_rollups),
+    (7, "recurring patterns", _recurring_patterns),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(engine: Engine) -> Optional[int]:
+    """Stored schema version, or None when the table is missing or empty."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(schema_version.c.version)).scalar()
+    except DBAPIError:
+        return None
+
+
+def run_migrations(engine: Engine) -> int:
+    """Bring the database up to LATEST_VERSION and return the version applied."""
+    version = current_version(engine)
+    if version == LATEST_VERSION:
+        return version
+    with engine.begin() as conn:
+        fresh = not inspect(conn).has_table(users.name)
+        version_metadata.create_all(conn)
+        if fresh:
+            Base.metadata.create_all(conn)
+        stored = conn.execute(select(schema_version.c.version)).scalar()
+        if stored is None:
+            version = LATEST_VERSION if fresh else 0
+            conn.execute(schema_version.insert().values(version=version))
+        else:
+            version = stored
+    for number, _, migrate in MIGRATIONS:
+        if number <= version:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(update(schema_version).values(version=number))
+        version = number
+    return version
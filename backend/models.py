@@ -1,6 +1,6 @@
 import datetime as dt
 
-from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.db import Base, utcnow
@@ -37,6 +37,7 @@ class UserSettings(Base):
     graph_end_date: Mapped[str | None] = mapped_column(String(10), nullable=True)
     safe_to_spend_days: Mapped[int] = mapped_column(Integer, default=14)
     debit_floor_target: Mapped[int] = mapped_column(Integer, default=0)
+    version: Mapped[int] = mapped_column(Integer, default=0)
 
     user: Mapped["User"] = relationship(back_populates="settings")
 
@@ -87,6 +88,7 @@ class Budget(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (Index("ix_transactions_user_date_id", "user_id", "date", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
@@ -96,6 +98,7 @@ class Transaction(Base):
     type: Mapped[str] = mapped_column(String(16))
     category_id: Mapped[int | None] = mapped_column(ForeignKey("categories.id"), nullable=True)
     source: Mapped[str] = mapped_column(String(32), default="manual")
+    fingerprint: Mapped[str | None] = mapped_column(String(40), unique=True, index=True, nullable=True)
 
 
 class Account(Base):
@@ -120,6 +123,7 @@ class AlertSetting(Base):
 
 class BillPayment(Base):
     __tablename__ = "bill_payments"
+    __table_args__ = (Index("ix_bill_payments_user_due_name", "user_id", "due_date", "bill_name"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
@@ -131,6 +135,7 @@ class BillPayment(Base):
 
 class WeeklySummary(Base):
     __tablename__ = "weekly_summaries"
+    __table_args__ = (Index("ix_weekly_summaries_user_week", "user_id", "week_start", unique=True),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
@@ -140,6 +145,34 @@ class WeeklySummary(Base):
     created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=utcnow)
 
 
+class MonthlySummary(Base):
+    __tablename__ = "monthly_summaries"
+    __table_args__ = (Index("ix_monthly_summaries_user_month", "user_id", "month_start", unique=True),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    month_start: Mapped[dt.date] = mapped_column(Date)
+    total_income: Mapped[float] = mapped_column(Float)
+    total_spend: Mapped[float] = mapped_column(Float)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=utcnow)
+
+
+class RecurringPattern(Base):
+    __tablename__ = "recurring_patterns"
+    __table_args__ = (Index("ix_recurring_patterns_user_key", "user_id", "name", "amount_key", unique=True),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    name: Mapped[str] = mapped_column(String(255))
+    amount_key: Mapped[int] = mapped_column(Integer)
+    amount: Mapped[int] = mapped_column(Integer)
+    frequency: Mapped[str] = mapped_column(String(32))
+    day: Mapped[dt.date] = mapped_column(Date)
+    type: Mapped[str] = mapped_column(String(16))
+    occurrences: Mapped[int] = mapped_column(Integer)
+    avg_gap: Mapped[float] = mapped_column(Float)
+
+
 class ExportBackup(Base):
     __tablename__ = "export_backups"
 
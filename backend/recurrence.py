@@ -0,0 +1,140 @@
+import datetime as dt
+import functools
+import itertools
+from typing import Any, Iterable, Iterator, List, Optional
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def _as_date(value: Any) -> Optional[dt.date]:
+    if isinstance(value, dt.date):
+        return value
+    if isinstance(value, dt.datetime):
+        return value.date()
+    try:
+        return dt.datetime.fromisoformat(str(value)).date()
+    except Exception:
+        return None
+
+
+class Recurrence:
+    """Parsed schedule of a Bill or Income row, independent of amount and name.
+
+    Occurrences are produced as day offsets from a window start. Weekly and
+    biweekly schedules are a plain (first offset, stride) range, monthly ones
+    step through calendar months, and annual or one-off ones yield at most one
+    offset. Every generator is lazy, so taking the next few occurrences never
+    materializes the rest of the window.
+    """
+
+    __slots__ = ("kind", "anchor", "weekday", "day_of_month")
+
+    def __init__(
+        self,
+        kind: str,
+        anchor: Optional[dt.date] = None,
+        weekday: Optional[int] = None,
+        day_of_month: Optional[int] = None,
+    ) -> None:
+        self.kind = kind
+        self.anchor = anchor
+        self.weekday = weekday
+        self.day_of_month = day_of_month
+
+    def first_and_stride(self, start: dt.date) -> Optional[tuple]:
+        """(first offset, stride) for fixed-stride schedules, else None."""
+        if self.kind == "biweekly":
+            delta = (self.anchor - start).days
+            return (delta % 14 if delta < 0 else delta), 14
+        if self.kind == "weekly":
+            target = start.weekday() if self.weekday is None else self.weekday
+            return (target - start.weekday()) % 7, 7
+        return None
+
+    def iter_offsets(self, start: dt.date, days: Optional[int] = None) -> Iterable[int]:
+        """Offsets in [0, days] (unbounded when days is None), in order."""
+        if self.kind == "none":
+            return ()
+        stride = self.first_and_stride(start)
+        if stride is not None:
+            first, step = stride
+            if days is None:
+                return itertools.count(first, step)
+            return range(first, days + 1, step)
+        if self.kind == "monthly":
+            return self._monthly_offsets(start, days)
+        occ = self._single_date(start)
+        if occ is None:
+            return ()
+        offset = (occ - start).days
+        if offset < 0 or (days is not None and offset > days):
+            return ()
+        return (offset,)
+
+    def iter_dates(self, start: dt.date, days: Optional[int] = None) -> Iterator[dt.date]:
+        for offset in self.iter_offsets(start, days):
+            yield start + dt.timedelta(days=offset)
+
+    def next_dates(self, start: dt.date, count: int) -> List[dt.date]:
+        return list(itertools.islice(self.iter_dates(start), count))
+
+    def offsets(self, start: dt.date, days: int) -> List[int]:
+        return list(self.iter_offsets(start, days))
+
+    def offsets_array(self, start: dt.date, days: int):
+        import numpy as np
+
+        stride = self.first_and_stride(start)
+        if stride is not None:
+            return np.arange(stride[0], days + 1, stride[1], dtype=np.int64)
+        return np.fromiter(self.iter_offsets(start, days), dtype=np.int64)
+
+    def _monthly_offsets(self, start: dt.date, days: Optional[int]) -> Iterator[int]:
+        dom = start.day if self.day_of_month is None else self.day_of_month
+        if dom < 1:
+            return
+        dom = min(dom, 28)
+        year, month = start.year, start.month
+        if dom < start.day:
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        while True:
+            offset = (dt.date(year, month, dom) - start).days
+            if days is not None and offset > days:
+                return
+            yield offset
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    def _single_date(self, start: dt.date) -> Optional[dt.date]:
+        if self.kind == "annual":
+            occ = dt.date(start.year, self.anchor.month, self.anchor.day)
+            if occ < start:
+                occ = dt.date(start.year + 1, self.anchor.month, self.anchor.day)
+            return occ
+        return self.anchor
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_recurrence(frequency: Any, day: Any) -> Recurrence:
+    freq = str(frequency or "").lower()
+    if "biweekly" in freq:
+        anchor = _as_date(day)
+        return Recurrence("biweekly", anchor=anchor) if anchor else Recurrence("none")
+    if "weekly" in freq:
+        weekday = None
+        if isinstance(day, str):
+            if day.lower() in WEEKDAYS:
+                weekday = WEEKDAYS.index(day.lower())
+        elif hasattr(day, "weekday"):
+            weekday = day.weekday()
+        return Recurrence("weekly", weekday=weekday)
+    if "monthly" in freq:
+        try:
+            dom = int(day)
+        except Exception:
+            dom = None
+        return Recurrence("monthly", day_of_month=dom)
+    if "ann" in freq:
+        anchor = _as_date(day)
+        return Recurrence("annual", anchor=anchor) if anchor else Recurrence("none")
+    anchor = _as_date(day)
+    return Recurrence("once", anchor=anchor) if anchor else Recurrence("none")
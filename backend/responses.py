@@ -0,0 +1,147 @@
+import os
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import orjson
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional; without it only gzip is offered
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.environ.get("BUDGET_APP_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.environ.get("BUDGET_APP_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BUDGET_APP_BROTLI_QUALITY", "4"))
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON rendered by orjson, which writes dates and datetimes natively.
+
+    Return it from the endpoint rather than naming it as response_class alone:
+    FastAPI runs jsonable_encoder over plain return values whatever the class,
+    and skipping that walk over every forecast row is most of the saving.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+# An encoder is (compress chunk, flush so far, finish) over one stream.
+Encoder = Tuple[Callable[[bytes], bytes], Callable[[], bytes], Callable[[], bytes]]
+
+
+def _gzip_encoder() -> Encoder:
+    stream = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return stream.compress, lambda: stream.flush(zlib.Z_SYNC_FLUSH), stream.flush
+
+
+def _brotli_encoder() -> Encoder:
+    stream = brotli.Compressor(quality=BROTLI_QUALITY)
+    return stream.process, stream.flush, stream.finish
+
+
+ENCODERS: Dict[str, Callable[[], Encoder]] = {"gzip": _gzip_encoder}
+if brotli is not None:
+    ENCODERS["br"] = _brotli_encoder
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Best encoding we support from an Accept-Encoding header, br first."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for name in ("br", "gzip"):
+        if name in ENCODERS and accepted.get(name, accepted.get("*", 0.0)) > 0:
+            return name
+    return None
+
+
+class CompressionMiddleware:
+    """gzip/brotli response compression above a minimum size.
+
+    Works like Starlette's GZipMiddleware: bodies sent in one message are
+    compressed whole when at least `minimum_size` bytes, and streamed bodies
+    are compressed chunk by chunk with a flush after each, so NDJSON rows
+    still reach the client as they are produced.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESS_MIN_BYTES) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = negotiate_encoding(Headers(scope=scope).get("Accept-Encoding", ""))
+            if encoding is not None:
+                await _CompressionResponder(self.app, self.minimum_size, encoding)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, minimum_size: int, encoding: str) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoding = encoding
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.encoder: Optional[Encoder] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the headers until the first body chunk decides the encoding.
+            self.initial_message = message
+            self.passthrough = "content-encoding" in Headers(raw=message["headers"])
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            if self.passthrough or (len(body) < self.minimum_size and not more_body):
+                self.passthrough = True
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+            self.encoder = ENCODERS[self.encoding]()
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("ETag")
+            if etag is not None and not etag.startswith("W/"):
+                # The compressed bytes differ from the identity body, so the
+                # validator can only promise semantic equivalence.
+                headers["ETag"] = f"W/{etag}"
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compress, _, finish = self.encoder
+                message["body"] = compress(body) + finish()
+                headers["Content-Length"] = str(len(message["body"]))
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+            await self.send(self.initial_message)
+        elif self.passthrough:
+            await self.send(message)
+            return
+        compress, flush, finish = self.encoder
+        message["body"] = compress(body) + (flush() if more_body else finish())
+        await self.send(message)
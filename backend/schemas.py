@@ -1,5 +1,6 @@
-from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, EmailStr
+import datetime as dt
+from typing import Any, Dict, List, Literal, Optional, Tuple, Type
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, create_model
 
 
 class AuthRegister(BaseModel):
@@ -44,3 +45,77 @@ class StatePayload(BaseModel):
 class CSVImportResult(BaseModel):
     imported: int
     skipped: int
+    duplicates: int = 0
+
+
+class CollectionItem(BaseModel):
+    # The frontend sends day-of-month values as numbers.
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+
+class BillCreate(CollectionItem):
+    name: str = ""
+    amount: int = 0
+    frequency: str = ""
+    day: str = ""
+    type: str = "Debit"
+
+
+class IncomeCreate(CollectionItem):
+    name: str = ""
+    amount: int = 0
+    frequency: str = ""
+    day: str = ""
+
+
+class AccountCreate(CollectionItem):
+    name: str = ""
+    type: str = "Checking"
+    balance: int = 0
+
+
+class AlertCreate(CollectionItem):
+    type: str = "low_balance"
+    threshold: int = 0
+    enabled: bool = True
+
+
+def _partial(model: Type[BaseModel]) -> Type[BaseModel]:
+    """Copy of model whose fields may be omitted but not sent as null."""
+    name = model.__name__.replace("Create", "Update")
+    fields = {field: (info.annotation, None) for field, info in model.model_fields.items()}
+    return create_model(name, __base__=CollectionItem, **fields)
+
+
+BillUpdate = _partial(BillCreate)
+IncomeUpdate = _partial(IncomeCreate)
+AccountUpdate = _partial(AccountCreate)
+AlertUpdate = _partial(AlertCreate)
+
+# Collection key -> (POST body, PATCH body).
+COLLECTION_SCHEMAS: Dict[str, Tuple[Type[BaseModel], Type[BaseModel]]] = {
+    "bills": (BillCreate, BillUpdate),
+    "income": (IncomeCreate, IncomeUpdate),
+    "accounts": (AccountCreate, AccountUpdate),
+    "alerts": (AlertCreate, AlertUpdate),
+}
+
+
+WHATIF_MAX_ITEMS = 500
+
+
+class WhatIfItem(BaseModel):
+    date: dt.date
+    amount: int
+    type: Literal["Debit", "Credit", "Income"] = "Debit"
+
+
+class WhatIfScenario(BaseModel):
+    name: str = ""
+    items: List[WhatIfItem] = Field([], max_length=WHATIF_MAX_ITEMS)
+
+
+class WhatIfRequest(BaseModel):
+    scenarios: List[WhatIfScenario] = Field(..., min_length=1, max_length=100)
+    days: int = Field(1825, ge=1, le=1825)
+    floor: Optional[int] = None
@@ -0,0 +1,237 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import Integer, String, cast, delete, insert, literal, null, select, union_all, update
+from sqlalchemy.orm import Session
+
+from backend.models import Account, AlertSetting, Bill, Budget, Category, Income, UserSettings
+
+
+SETTINGS_FIELDS = [
+    "debit_balance",
+    "credit_balance",
+    "cc_pay_day",
+    "cc_pay_method_value",
+    "cc_pay_amount_value",
+    "cc_pay_amount_unit_value",
+    "cc_apr_value",
+    "cashflow_days",
+    "cashflow_view_filter",
+    "graph_view_type",
+    "graph_end_date",
+    "safe_to_spend_days",
+    "debit_floor_target",
+]
+
+# Payload key -> (model, coercion of one incoming item into column values).
+COLLECTIONS: Dict[str, Tuple[Type[Any], Callable[[Dict[str, Any]], Dict[str, Any]]]] = {
+    "bills": (
+        Bill,
+        lambda item: {
+            "name": item.get("name", ""),
+            "amount": int(item.get("amount", 0)),
+            "frequency": item.get("frequency", ""),
+            "day": str(item.get("day", "")),
+            "type": item.get("type", "Debit"),
+        },
+    ),
+    "income": (
+        Income,
+        lambda item: {
+            "name": item.get("name", ""),
+            "amount": int(item.get("amount", 0)),
+            "frequency": item.get("frequency", ""),
+            "day": str(item.get("day", "")),
+        },
+    ),
+    "categories": (
+        Category,
+        lambda item: {
+            "name": item.get("name", ""),
+            "type": item.get("type", "Expense"),
+        },
+    ),
+    "budgets": (
+        Budget,
+        lambda item: {
+            "category_id": int(item.get("category_id", 0)),
+            "amount": int(item.get("amount", 0)),
+            "period": item.get("period", "Monthly"),
+        },
+    ),
+    "alerts": (
+        AlertSetting,
+        lambda item: {
+            "type": item.get("type", "low_balance"),
+            "threshold": int(item.get("threshold", 0)),
+            "enabled": bool(item.get("enabled", True)),
+        },
+    ),
+    "accounts": (
+        Account,
+        lambda item: {
+            "name": item.get("name", ""),
+            "type": item.get("type", "Checking"),
+            "balance": int(item.get("balance", 0)),
+        },
+    ),
+}
+
+
+def _item_id(item: Dict[str, Any]) -> Optional[int]:
+    try:
+        return int(item.get("id"))
+    except (TypeError, ValueError):
+        return None
+
+
+def sync_collection(db: Session, key: str, user_id: int, items: List[Dict[str, Any]]) -> bool:
+    """Make a user's rows for one collection match the payload.
+
+    Items are matched to existing rows by id. Only rows whose values differ
+    are updated, unmatched items are inserted and rows missing from the
+    payload are deleted, each as a single bulk statement. Returns whether
+    anything changed.
+    """
+    model, to_values = COLLECTIONS[key]
+    columns = [getattr(model, name) for name in to_values({})]
+    existing = {
+        row[0]: tuple(row[1:])
+        for row in db.execute(select(model.id, *columns).where(model.user_id == user_id))
+    }
+    updates: List[Dict[str, Any]] = []
+    inserts: List[Dict[str, Any]] = []
+    kept = set()
+    for item in items:
+        values = to_values(item)
+        item_id = _item_id(item)
+        if item_id in existing and item_id not in kept:
+            kept.add(item_id)
+            if tuple(values.values()) != existing[item_id]:
+                updates.append({"id": item_id, **values})
+        else:
+            inserts.append({"user_id": user_id, **values})
+    removed = [row_id for row_id in existing if row_id not in kept]
+    if removed:
+        db.execute(delete(model).where(model.id.in_(removed)))
+    if updates:
+        db.execute(update(model), updates)
+    if inserts:
+        db.execute(insert(model), inserts)
+    return bool(removed or updates or inserts)
+
+
+def bump_version(db: Session, user_id: int, expected: Optional[int] = None) -> Optional[int]:
+    """Advance the user's state version, optionally only from `expected`.
+
+    Returns the new version, or None when another writer got there first.
+    """
+    stmt = update(UserSettings).where(UserSettings.user_id == user_id)
+    if expected is not None:
+        stmt = stmt.where(UserSettings.version == expected)
+    result = db.execute(
+        stmt.values(version=UserSettings.version + 1).execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        return None
+    return db.execute(select(UserSettings.version).where(UserSettings.user_id == user_id)).scalar_one()
+
+
+def _row_dict(to_values: Callable[[Dict[str, Any]], Dict[str, Any]], row: Any) -> Dict[str, Any]:
+    return {"id": row.id, **{name: getattr(row, name) for name in to_values({})}}
+
+
+def create_item(db: Session, key: str, user_id: int, item: Dict[str, Any]) -> Dict[str, Any]:
+    model, to_values = COLLECTIONS[key]
+    row = model(user_id=user_id, **to_values(item))
+    db.add(row)
+    db.flush()
+    return _row_dict(to_values, row)
+
+
+def update_item(
+    db: Session, key: str, user_id: int, row_id: int, patch: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    model, to_values = COLLECTIONS[key]
+    row = db.query(model).filter(model.id == row_id, model.user_id == user_id).first()
+    if row is None:
+        return None
+    current = _row_dict(to_values, row)
+    for name, value in to_values({**current, **patch}).items():
+        setattr(row, name, value)
+    db.flush()
+    return _row_dict(to_values, row)
+
+
+def delete_item(db: Session, key: str, user_id: int, row_id: int) -> bool:
+    model, _ = COLLECTIONS[key]
+    result = db.execute(delete(model).where(model.id == row_id, model.user_id == user_id))
+    return result.rowcount > 0
+
+
+def _layout(key: str) -> Tuple[List[str], List[str]]:
+    sample = COLLECTIONS[key][1]({})
+    texts = [name for name, value in sample.items() if isinstance(value, str)]
+    numbers = [name for name, value in sample.items() if not isinstance(value, str)]
+    return texts, numbers
+
+
+# Per collection: (text fields, integer fields) in union slot order.
+STATE_LAYOUTS = {key: _layout(key) for key in COLLECTIONS}
+_TEXT_SLOTS = max(len(texts) for texts, _ in STATE_LAYOUTS.values())
+_INT_SLOTS = max(len(numbers) for _, numbers in STATE_LAYOUTS.values())
+
+
+def _field_slots(key: str) -> List[Tuple[str, int, bool]]:
+    """(field, row index, is boolean) for each field in response order."""
+    texts, numbers = STATE_LAYOUTS[key]
+    sample = COLLECTIONS[key][1]({})
+    slots = {name: 2 + i for i, name in enumerate(texts)}
+    slots.update({name: 2 + _TEXT_SLOTS + i for i, name in enumerate(numbers)})
+    return [(name, slots[name], isinstance(value, bool)) for name, value in sample.items()]
+
+
+_FIELD_SLOTS = [(key, _field_slots(key)) for key in STATE_LAYOUTS]
+
+
+def _collections_statement(user_id: int) -> Any:
+    selects = []
+    for kind, (key, (texts, numbers)) in enumerate(STATE_LAYOUTS.items()):
+        model = COLLECTIONS[key][0]
+        text_columns = [cast(getattr(model, name), String) for name in texts]
+        int_columns = [cast(getattr(model, name), Integer) for name in numbers]
+        text_columns += [cast(null(), String)] * (_TEXT_SLOTS - len(texts))
+        int_columns += [cast(null(), Integer)] * (_INT_SLOTS - len(numbers))
+        selects.append(
+            select(literal(kind, Integer).label("kind"), model.id, *text_columns, *int_columns).where(
+                model.user_id == user_id
+            )
+        )
+    return union_all(*selects).order_by("kind", "id")
+
+
+def load_state(db: Session, user_id: int) -> Optional[Dict[str, Any]]:
+    """Read a user's settings and every collection as plain row tuples.
+
+    Collections come back from a single UNION ALL whose rows carry a
+    collection index, the id, then text and integer slots that each
+    collection's layout maps back to named fields. Returns None when the
+    user has no settings row yet.
+    """
+    settings = db.execute(
+        select(*[getattr(UserSettings, name) for name in SETTINGS_FIELDS], UserSettings.version).where(
+            UserSettings.user_id == user_id
+        )
+    ).first()
+    if settings is None:
+        return None
+    state: Dict[str, Any] = dict(zip(SETTINGS_FIELDS + ["version"], settings))
+    for key, _ in _FIELD_SLOTS:
+        state[key] = []
+    for row in db.execute(_collections_statement(user_id)):
+        key, slots = _FIELD_SLOTS[row[0]]
+        item = {"id": row[1]}
+        for name, index, is_bool in slots:
+            value = row[index]
+            item[name] = bool(value) if is_bool and value is not None else value
+        state[key].append(item)
+    return state
@@ -0,0 +1,104 @@
+import datetime as dt
+from typing import Any, Dict, List, Type
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from backend.db import dialect_insert
+from backend.models import MonthlySummary, Transaction, WeeklySummary
+
+Totals = Dict[Any, List[float]]
+
+
+def week_start(date: dt.date) -> dt.date:
+    return date - dt.timedelta(days=date.weekday())
+
+
+def month_start(date: dt.date) -> dt.date:
+    return date.replace(day=1)
+
+
+def add_to_totals(totals: Totals, key: Any, amount: float) -> None:
+    bucket = totals.setdefault(key, [0.0, 0.0])
+    if amount > 0:
+        bucket[0] += amount
+    elif amount < 0:
+        bucket[1] += abs(amount)
+
+
+def _roll_up(daily: Totals, period_start) -> Totals:
+    out: Totals = {}
+    for date, (income, spend) in daily.items():
+        bucket = out.setdefault(period_start(date), [0.0, 0.0])
+        bucket[0] += income
+        bucket[1] += spend
+    return out
+
+
+def _apply(db: Session, model: Type[Any], column: str, user_id: int, totals: Totals) -> None:
+    if not totals:
+        return
+    # Add to existing rows in the INSERT itself, so concurrent imports
+    # into the same period cannot both try to create its row.
+    stmt = dialect_insert(db, model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[model.user_id, getattr(model, column)],
+        set_={
+            "total_income": model.total_income + stmt.excluded.total_income,
+            "total_spend": model.total_spend + stmt.excluded.total_spend,
+        },
+    )
+    db.execute(
+        stmt,
+        [
+            {"user_id": user_id, column: start, "total_income": income, "total_spend": spend}
+            for start, (income, spend) in totals.items()
+        ],
+    )
+
+
+def apply_transaction_totals(db: Session, user_id: int, daily: Totals) -> None:
+    """Fold per-day income/spend deltas into the weekly and monthly rollups."""
+    _apply(db, WeeklySummary, "week_start", user_id, _roll_up(daily, week_start))
+    _apply(db, MonthlySummary, "month_start", user_id, _roll_up(daily, month_start))
+
+
+def rebuild_summaries(conn: Connection) -> None:
+    weekly: Totals = {}
+    monthly: Totals = {}
+    result = conn.execution_options(stream_results=True, yield_per=1000).execute(
+        select(Transaction.user_id, Transaction.date, Transaction.amount)
+    )
+    for user_id, date, amount in result:
+        add_to_totals(weekly, (user_id, week_start(date)), amount)
+        add_to_totals(monthly, (user_id, month_start(date)), amount)
+    conn.execute(delete(WeeklySummary))
+    conn.execute(delete(MonthlySummary))
+    now = dt.datetime.utcnow()
+    for model, column, totals in (
+        (WeeklySummary, "week_start", weekly),
+        (MonthlySummary, "month_start", monthly),
+    ):
+        rows = [
+            {"user_id": user_id, column: start, "total_income": income, "total_spend": spend, "created_at": now}
+            for (user_id, start), (income, spend) in totals.items()
+        ]
+        if rows:
+            conn.execute(insert(model), rows)
+
+
+def summary_range(
+    db: Session, user_id: int, period: str, start: dt.date, end: dt.date
+) -> List[Dict[str, Any]]:
+    model, column = (MonthlySummary, "month_start") if period == "monthly" else (WeeklySummary, "week_start")
+    key = getattr(model, column)
+    rows = db.execute(
+        select(key, model.total_income, model.total_spend)
+        .where(model.user_id == user_id, key >= start, key <= end)
+        .order_by(key)
+    ).all()
+    return [
+        {"period_start": row[0].isoformat(), "total_income": round(row[1], 2), "total_spend": round(row[2], 2)}
+        for row in rows
+    ]
@@ -0,0 +1,110 @@
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+_DB_DIR = tempfile.mkdtemp(prefix="budget-app-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}")
+
+
+@pytest.fixture()
+def client():
+    from fastapi.testclient import TestClient
+
+    from backend.auth import invalidate_user
+    from backend.db import Base, engine
+    from backend.logic import forecast_cache
+    from backend.main import app
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    forecast_cache.clear()
+    invalidate_user()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture()
+def db(client):
+    from backend.db import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+class Statement(str):
+    """SQL text of one cursor execution; rows is the executemany batch size."""
+
+    rows = 1
+
+
+@pytest.fixture()
+def capture_sql():
+    """capture_sql(engine=app engine) is a context manager yielding the statements it runs."""
+    from sqlalchemy import event
+
+    @contextlib.contextmanager
+    def capture(target=None):
+        from backend.db import engine
+
+        target = target or engine
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            executed = Statement(statement)
+            executed.rows = len(parameters) if executemany else 1
+            statements.append(executed)
+
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+    return capture
+
+
+@pytest.fixture()
+def import_csv(client):
+    """Upload a CSV body, or (date, description, amount) rows, to the import endpoint."""
+
+    def upload(rows):
+        body = rows if isinstance(rows, str) else "date,description,amount\n" + "".join(
+            f"{d},{n},{a}\n" for d, n, a in rows
+        )
+        return client.post("/api/transactions/import", files={"file": ("tx.csv", body.encode("utf-8"), "text/csv")})
+
+    return upload
+
+
+@pytest.fixture()
+def run_python(tmp_path):
+    """Run code in a fresh interpreter from the repo root against tmp_path/app.db.
+
+    Keyword arguments become environment variables; positional options go to
+    the interpreter before -c.
+    """
+
+    def run(code, *options, **env):
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'app.db'}", **env}
+        result = subprocess.run(
+            [sys.executable, *options, "-c", textwrap.dedent(code)],
+            cwd=REPO_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            pytest.fail(f"subprocess exited with {result.returncode}:\n{result.stderr}")
+        return result
+
+    return run
@@ -0,0 +1,46 @@
+import datetime as dt
+
+from backend import logic
+
+
+def test_all_alert_types_share_one_forecast(client, monkeypatch):
+    due = (dt.date.today() + dt.timedelta(days=3)).isoformat()
+    client.put(
+        "/api/state",
+        json={
+            "debit_balance": 500,
+            "credit_balance": 900,
+            "debit_floor_target": 200,
+            "bills": [
+                {"name": "Car repair", "amount": 450, "frequency": "One-time", "day": due, "type": "Debit"},
+                {"name": "Coffee", "amount": 5, "frequency": "One-time", "day": due, "type": "Debit"},
+            ],
+            "alerts": [
+                {"type": "low_balance", "threshold": 100, "enabled": True},
+                {"type": "low_balance", "threshold": 10, "enabled": True},
+                {"type": "credit_ceiling", "threshold": 800, "enabled": True},
+                {"type": "days_until_floor", "threshold": 7, "enabled": True},
+                {"type": "large_bill", "threshold": 400, "enabled": True},
+                {"type": "large_bill", "threshold": 1, "enabled": False},
+            ],
+        },
+    )
+    calls = []
+    simulate = logic.simulate_libraries
+    monkeypatch.setattr(logic, "simulate_libraries", lambda *args: calls.append(args) or simulate(*args))
+
+    results = client.get("/api/alerts").json()
+
+    assert len(calls) == 1
+    assert results == [
+        {"type": "low_balance", "message": "Balance below threshold", "value": 45},
+        {"type": "credit_ceiling", "message": "Credit balance above ceiling", "value": 900},
+        {"type": "days_until_floor", "message": "Balance drops below floor", "value": 3},
+        {"type": "large_bill", "message": f"Car repair due {due}", "value": 450},
+    ]
+
+
+def test_disabled_alerts_skip_the_forecast(client, monkeypatch):
+    client.put("/api/state", json={"alerts": [{"type": "low_balance", "threshold": 100, "enabled": False}]})
+    monkeypatch.setattr(logic, "simulate_libraries", None)
+    assert client.get("/api/alerts").json() == []
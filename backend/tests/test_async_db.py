@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from backend.auth import run_db
+from backend.db import async_url
+
+
+def test_async_url_swaps_in_async_drivers():
+    assert async_url("sqlite:///budget_app.db") == "sqlite+aiosqlite:///budget_app.db"
+    assert async_url("postgresql+asyncpg://u:p@host/db") == "postgresql+asyncpg://u:p@host/db"
+    assert async_url("sqlite+pysqlite:///x.db") == "sqlite+pysqlite:///x.db"
+
+
+def test_run_db_uses_threadpool_for_sync_sessions(db):
+    result = asyncio.run(run_db(db, lambda session, value: (session is db, value), 7))
+    assert result == (True, 7)
+
+
+def test_async_mode_serves_io_endpoints(run_python):
+    pytest.importorskip("aiosqlite")
+    run_python(
+        """
+        import asyncio
+
+        from fastapi.testclient import TestClient
+        from backend import auth, main
+        from backend.main import app
+
+        def off_loop(fn):
+            def guarded(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    return fn(*args, **kwargs)
+                raise AssertionError(f"{fn.__name__} ran on the event loop")
+
+            return guarded
+
+        # Settings creation, password hashing and the forecast all block.
+        main._ensure_settings = off_loop(main._ensure_settings)
+        main.build_upcoming_libraries = off_loop(main.build_upcoming_libraries)
+        auth.hash_password = off_loop(auth.hash_password)
+        with TestClient(app) as client:
+            assert client.get("/api/state").json()["version"] == 0
+            assert client.get("/api/transactions").json() == []
+            assert client.get("/api/checklist").status_code == 200
+            assert client.get("/api/summary/weekly").json()["total_spend"] == 0
+            assert client.get("/api/summary/range").json() == []
+        """,
+        BUDGET_APP_ASYNC_DB="1",
+    )
@@ -0,0 +1,48 @@
+from backend.auth import user_cache
+
+
+def _register(client, email="cache@example.com"):
+    res = client.post(
+        "/api/auth/register",
+        json={
+            "email": email,
+            "username": email.split("@")[0],
+            "password": "Secret-123",
+            "confirm_password": "Secret-123",
+        },
+    )
+    assert res.status_code == 200
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+def test_token_user_is_served_from_cache(client, capture_sql):
+    headers = _register(client)
+    assert client.get("/api/auth/me", headers=headers).json()["email"] == "cache@example.com"
+
+    with capture_sql() as statements:
+        res = client.get("/api/auth/me", headers=headers)
+    assert res.json()["email"] == "cache@example.com"
+    assert not any("FROM users" in statement for statement in statements)
+
+
+def test_guest_user_is_memoized(client, capture_sql):
+    first = client.get("/api/auth/me").json()
+    with capture_sql() as statements:
+        second = client.get("/api/auth/me").json()
+    assert first == second
+    assert statements == []
+
+
+def test_register_invalidates_guest(client):
+    client.get("/api/auth/me")
+    assert user_cache.guest is not None
+    _register(client, "other@example.com")
+    assert user_cache.guest is None
+
+
+def test_expired_entries_are_reloaded(client, monkeypatch):
+    headers = _register(client)
+    me = client.get("/api/auth/me", headers=headers).json()
+    monkeypatch.setattr("backend.auth.time.monotonic", lambda: 1e12)
+    assert user_cache.get(me["id"]) is None
+    assert client.get("/api/auth/me", headers=headers).json() == me
@@ -0,0 +1,40 @@
+import datetime as dt
+
+
+def _seed_bills(client, count):
+    client.put(
+        "/api/state",
+        json={
+            "bills": [
+                {"name": f"Bill {i}", "amount": 10 + i, "frequency": "Weekly", "day": "Monday", "type": "Debit"}
+                for i in range(count)
+            ]
+        },
+    )
+
+
+def test_checklist_query_count_is_independent_of_window(client, capture_sql):
+    _seed_bills(client, 20)
+    counts = {}
+    for days in (7, 30, 365, 1825):
+        client.get(f"/api/checklist?days={days}")
+        with capture_sql() as statements:
+            items = client.get(f"/api/checklist?days={days}").json()
+        assert len(items) >= 20 * (days // 7)
+        counts[days] = len(statements)
+        assert sum("FROM bill_payments" in s for s in statements) == 1
+    assert len(set(counts.values())) == 1
+
+
+def test_checklist_reports_marked_payments(client):
+    _seed_bills(client, 2)
+    items = client.get("/api/checklist?days=30").json()
+    target = items[1]
+    client.post(
+        "/api/checklist/mark",
+        json={"bill_name": target["bill_name"], "due_date": target["due_date"], "paid": True},
+    )
+    after = client.get("/api/checklist?days=30").json()
+    paid = [(i["bill_name"], i["due_date"]) for i in after if i["paid"]]
+    assert paid == [(target["bill_name"], target["due_date"])]
+    assert dt.date.fromisoformat(target["due_date"]) >= dt.date.today()
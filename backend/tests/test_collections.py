@@ -0,0 +1,46 @@
+import datetime as dt
+
+
+def test_bill_crud_touches_one_row_and_advances_version(client):
+    version = client.get("/api/state").json()["version"]
+    created = client.post(
+        "/api/bills", json={"name": "Rent", "amount": 1200, "frequency": "Monthly", "day": 1, "type": "Debit"}
+    ).json()
+    bill = created["item"]
+    assert created["version"] == version + 1
+    assert bill == {"id": bill["id"], "name": "Rent", "amount": 1200, "frequency": "Monthly", "day": "1", "type": "Debit"}
+    other = client.post("/api/bills", json={"name": "Gym", "amount": 30, "frequency": "Weekly", "day": "Monday"})
+
+    patched = client.patch(f"/api/bills/{bill['id']}", json={"amount": 1250}, headers={"If-Match": str(version + 2)})
+    assert patched.json() == {"item": dict(bill, amount=1250), "version": version + 3}
+    assert patched.headers["ETag"] == f'"{version + 3}"'
+    assert client.patch(f"/api/bills/{bill['id']}", json={"amount": 1}, headers={"If-Match": "1"}).status_code == 409
+
+    assert client.delete(f"/api/bills/{bill['id']}").json() == {"deleted": bill["id"], "version": version + 4}
+    assert client.delete(f"/api/bills/{bill['id']}").status_code == 404
+    assert [b["name"] for b in client.get("/api/state").json()["bills"]] == ["Gym"]
+    assert other.json()["item"]["type"] == "Debit"
+
+
+def test_income_writes_refresh_the_forecast(client):
+    client.put("/api/state", json={"debit_balance": 100})
+    due = (dt.date.today() + dt.timedelta(days=3)).isoformat()
+    assert client.get("/api/libraries?days=30").json()["upcoming_incomes"] == []
+
+    income = client.post("/api/income", json={"name": "Bonus", "amount": 500, "frequency": "One-time", "day": due})
+    incomes = client.get("/api/libraries?days=30").json()["upcoming_incomes"]
+    assert incomes == [{"date": due, "name": "Bonus", "amount": 500}]
+
+    client.patch(f"/api/income/{income.json()['item']['id']}", json={"day": "2999-01-01"})
+    assert client.get("/api/libraries?days=30").json()["upcoming_incomes"] == []
+    assert client.patch("/api/accounts/999", json={"balance": 1}).status_code == 404
+
+
+def test_collection_payloads_are_validated(client):
+    assert client.post("/api/bills", json={"name": "Rent", "amount": "lots"}).status_code == 422
+    bill = client.post("/api/bills", json={"name": "Rent", "amount": 900, "frequency": "Monthly", "day": 3}).json()
+    item_id = bill["item"]["id"]
+    assert client.patch(f"/api/bills/{item_id}", json={"day": None}).status_code == 422
+    assert client.patch(f"/api/bills/{item_id}", json={"amount": "x"}).status_code == 422
+    assert client.patch("/api/alerts/1", json={"enabled": "maybe"}).status_code == 422
+    assert client.get("/api/state").json()["bills"] == [bill["item"]]
@@ -0,0 +1,66 @@
+import datetime as dt
+import json
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from backend.forecast import simulate_libraries_numpy
+from backend.logic import credit_card_bill_entry, simulate_libraries
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+PAY_METHODS = [
+    ("I want to pay my bill in full", None, None),
+    ("I pay the minimum", 1, 5),
+    ("Custom", 0, 150),
+    ("Custom", 1, 40),
+]
+
+
+def _random_entry(rng: random.Random, start: dt.date) -> dict:
+    frequency = rng.choice(["Weekly", "Biweekly", "Monthly", "Annually", "One-time"])
+    if frequency == "Weekly":
+        day = rng.choice(WEEKDAYS)
+    elif frequency == "Monthly":
+        day = str(rng.randint(1, 31))
+    else:
+        day = (start + dt.timedelta(days=rng.randint(-400, 400))).isoformat()
+    return {
+        "name": f"Entry {rng.randint(0, 5)}",
+        "amount": rng.randint(1, 3000),
+        "frequency": frequency,
+        "day": day,
+        "type": rng.choice(["Debit", "Credit"]),
+        "auto": False,
+    }
+
+
+def _random_inputs(seed: int):
+    rng = random.Random(seed)
+    start = dt.date(2026, 1, 1) + dt.timedelta(days=rng.randint(0, 365))
+    method, unit, amount = rng.choice(PAY_METHODS)
+    settings = SimpleNamespace(
+        debit_balance=rng.randint(-500, 10000),
+        credit_balance=rng.randint(-300, 5000),
+        cc_pay_day=rng.choice([None, rng.randint(1, 31)]),
+        cc_pay_method_value=method,
+        cc_pay_amount_unit_value=unit,
+        cc_pay_amount_value=amount,
+        cc_apr_value=rng.choice([None, 0, 19, 29]),
+    )
+    bills = [_random_entry(rng, start) for _ in range(rng.randint(0, 12))]
+    cc_bill = credit_card_bill_entry(settings)
+    if cc_bill:
+        bills.append(cc_bill)
+    incomes = [dict(_random_entry(rng, start), type="Credit") for _ in range(rng.randint(0, 4))]
+    return settings, bills, incomes, start
+
+
+@pytest.mark.parametrize("seed", range(60))
+@pytest.mark.parametrize("days", [1, 30, 1825])
+def test_numpy_engine_matches_python_engine(seed, days):
+    settings, bills, incomes, start = _random_inputs(seed)
+    expected = simulate_libraries(settings, bills, incomes, start, days)
+    actual = simulate_libraries_numpy(settings, bills, incomes, start, days)
+    assert json.dumps(actual, default=str) == json.dumps(expected, default=str)
+    assert actual == expected
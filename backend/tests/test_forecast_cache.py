@@ -0,0 +1,131 @@
+import datetime as dt
+import json
+
+import pytest
+
+from backend.logic import ForecastCache, compute_upcoming_libraries, forecast_cache, state_version
+
+
+def _seed_state(client):
+    return client.put(
+        "/api/state",
+        json={
+            "debit_balance": 2500,
+            "credit_balance": 400,
+            "cc_pay_day": 13,
+            "cc_apr_value": 24,
+            "cc_pay_method_value": "Custom",
+            "cc_pay_amount_unit_value": 0,
+            "cc_pay_amount_value": 150,
+            "bills": [
+                {"name": "Rent", "amount": 1200, "frequency": "Monthly", "day": "1", "type": "Debit"},
+                {"name": "Groceries", "amount": 90, "frequency": "Weekly", "day": "Friday", "type": "Credit"},
+            ],
+            "income": [{"name": "Pay", "amount": 1800, "frequency": "Biweekly", "day": "2026-01-02"}],
+        },
+    ).json()
+
+
+def test_windows_are_slices_of_the_cached_horizon(client, db):
+    _seed_state(client)
+    user_id = client.get("/api/auth/me").json()["id"]
+    for days in (1, 14, 30, 365, 1825):
+        expected = json.loads(json.dumps(compute_upcoming_libraries(db, user_id, days), default=str))
+        assert client.get(f"/api/libraries?days={days}").json() == expected
+    version = state_version(db, user_id)
+    assert forecast_cache.get((user_id, version, dt.date.today(), 1825)) is not None
+
+
+def test_put_state_invalidates_cached_forecast(client):
+    _seed_state(client)
+    before = client.get("/api/safe_to_spend?days=30").json()["safe_to_spend"]
+    client.put("/api/state", json={"debit_balance": 100000})
+    after = client.get("/api/safe_to_spend?days=30").json()["safe_to_spend"]
+    assert after == before + 100000 - 2500
+
+    client.post("/api/backup/upload", json={"debit_balance": 0})
+    assert client.get("/api/safe_to_spend?days=30").json()["safe_to_spend"] == before - 2500
+
+
+def test_cache_evicts_least_recently_used_under_budget():
+    today = dt.date.today()
+    row = {"date": today.isoformat(), "balance": 0}
+    data = {
+        "upcoming_debit_bills": [],
+        "upcoming_credit_bills": [],
+        "upcoming_incomes": [],
+        "debit_balance_forecast": [row] * 10,
+        "credit_balance_forecast": [row] * 10,
+    }
+    cache = ForecastCache(max_bytes=3 * 6624)
+    for user_id in range(3):
+        assert cache.get((user_id, 0, today, 1825)) is None
+        cache.put((user_id, 0, today, 1825), data)
+    assert cache.get((0, 0, today, 1825)) is data
+    cache.put((3, 0, today, 1825), data)
+    assert cache.get((1, 0, today, 1825)) is None
+    assert cache.get((0, 0, today, 1825)) is data
+
+    cache.get((0, 0, today + dt.timedelta(days=1), 1825))
+    assert cache.get((0, 0, today, 1825)) is None
+
+
+def test_write_from_another_worker_is_seen_through_the_state_version(client, db):
+    from backend.models import Bill
+    from backend.state import bump_version
+
+    _seed_state(client)
+    user_id = client.get("/api/auth/me").json()["id"]
+    before = client.get("/api/libraries?days=60").json()
+    assert not any(bill["name"] == "Gym" for bill in before["upcoming_debit_bills"])
+
+    # Another process commits a write; this process's cache is never told.
+    db.add(Bill(user_id=user_id, name="Gym", amount=40, frequency="Weekly", day="Monday", type="Debit"))
+    bump_version(db, user_id)
+    db.commit()
+
+    after = client.get("/api/libraries?days=60").json()
+    assert any(bill["name"] == "Gym" for bill in after["upcoming_debit_bills"])
+    version = state_version(db, user_id)
+    assert forecast_cache.get((user_id, version - 1, dt.date.today(), 1825)) is None
+
+
+def test_stale_version_put_is_ignored():
+    today = dt.date.today()
+    row = {"date": today.isoformat(), "balance": 0}
+    data = {
+        "upcoming_debit_bills": [],
+        "upcoming_credit_bills": [],
+        "upcoming_incomes": [],
+        "debit_balance_forecast": [row],
+        "credit_balance_forecast": [row],
+    }
+    cache = ForecastCache(max_bytes=1 << 20)
+    assert cache.get((1, 5, today, 1825)) is None
+    cache.put((1, 4, today, 1825), data)
+    assert cache.get((1, 4, today, 1825)) is None
+
+
+def test_derived_structures_count_toward_the_budget():
+    np = pytest.importorskip("numpy")
+    today = dt.date.today()
+    row = {"date": today.isoformat(), "balance": 0}
+    data = {
+        "upcoming_debit_bills": [],
+        "upcoming_credit_bills": [],
+        "upcoming_incomes": [],
+        "debit_balance_forecast": [row] * 10,
+        "credit_balance_forecast": [row] * 10,
+    }
+    cache = ForecastCache(max_bytes=2 * 6624 + 1000)
+    for user_id in range(2):
+        cache.get((user_id, 0, today, 1825))
+        cache.put((user_id, 0, today, 1825), data)
+    assert cache._bytes == 2 * 6624
+
+    arrays = cache.derived((1, 0, today, 1825), "arrays", data, lambda d: (np.zeros(100), np.zeros(100)))
+    assert cache.derived((1, 0, today, 1825), "arrays", data, lambda d: None) is arrays
+    # 1600 more bytes push the oldest entry out.
+    assert cache.get((0, 0, today, 1825)) is None
+    assert cache.get((1, 0, today, 1825)) is data
+    assert cache._bytes == 6624 + 1600
@@ -0,0 +1,64 @@
+import asyncio
+import datetime as dt
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from backend.forecast_pool import ForecastPool
+from backend.forecast import expand_libraries
+from backend.logic import compact_libraries, compute_upcoming_libraries
+
+
+STATE = {
+    "debit_balance": 3000,
+    "credit_balance": 500,
+    "cc_pay_day": 20,
+    "cc_apr_value": 18,
+    "cc_pay_method_value": "Full",
+    "bills": [
+        {"name": "Rent", "amount": 1400, "frequency": "Monthly", "day": "1", "type": "Debit"},
+        {"name": "Fuel", "amount": 60, "frequency": "Weekly", "day": "Saturday", "type": "Credit"},
+    ],
+    "income": [{"name": "Pay", "amount": 2100, "frequency": "Biweekly", "day": "2026-01-09"}],
+}
+
+
+@pytest.fixture()
+def pool():
+    pool = ForecastPool(workers=1, queue_limit=4)
+    yield pool
+    pool.shutdown()
+
+
+def test_pooled_libraries_match_in_process(client, db, pool, monkeypatch):
+    monkeypatch.setattr("backend.main.forecast_pool", pool)
+    client.put("/api/state", json=STATE)
+    user_id = client.get("/api/auth/me").json()["id"]
+    for days in (30, 1825):
+        expected = json.loads(json.dumps(compute_upcoming_libraries(db, user_id, days), default=str))
+        assert client.get(f"/api/libraries?days={days}").json() == expected
+    # The 1825-day horizon was simulated once and the 30-day call sliced from it.
+    assert pool.metrics()["completed"] == 1
+
+
+def test_user_without_settings_gets_empty_libraries_without_a_worker(db, pool):
+    libraries = asyncio.run(pool.build_libraries(db, 999, 30))
+    assert libraries["debit_balance_forecast"] == []
+    assert pool.metrics()["completed"] == 0
+
+
+def test_pool_refuses_work_past_queue_limit():
+    pool = ForecastPool(workers=1, queue_limit=0)
+    pool._pending = 1
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(pool.simulate(None, [], [], dt.date.today(), 1))
+    assert exc.value.status_code == 503
+    assert pool.metrics()["rejected"] == 1
+
+
+def test_compact_form_round_trips(client, db):
+    client.put("/api/state", json=STATE)
+    user_id = client.get("/api/auth/me").json()["id"]
+    libraries = compute_upcoming_libraries(db, user_id, 400)
+    assert expand_libraries(compact_libraries(libraries, dt.date.today())) == libraries
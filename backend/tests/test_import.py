@@ -0,0 +1,72 @@
+import io
+
+from backend import importer
+
+CSV = (
+    "date,description,amount\n"
+    "2026-01-02,Café Olé,-4.50\n"
+    "01/03/2026,Paycheck,1800\n"
+    "not a date,Broken,-1\n"
+    "2026-01-04,Missing amount,\n"
+    '2026-01-05,"Rent, January",-1200\n'
+    "2026-01-06,Groceries,-82.10\n"
+)
+
+
+def test_import_streams_rows_in_batches(client, monkeypatch, capture_sql, import_csv):
+    monkeypatch.setattr(importer, "IMPORT_BATCH_SIZE", 2)
+    with capture_sql() as statements:
+        response = import_csv(CSV)
+
+    assert response.json() == {"imported": 4, "skipped": 2, "duplicates": 0}
+    assert len([s for s in statements if s.startswith("INSERT INTO transactions")]) == 2
+    rows = client.get("/api/transactions").json()
+    assert sorted((r["date"], r["name"], r["amount"], r["type"]) for r in rows) == [
+        ("2026-01-02", "Café Olé", -4.5, "Debit"),
+        ("2026-01-03", "Paycheck", 1800.0, "Credit"),
+        ("2026-01-05", "Rent, January", -1200.0, "Debit"),
+        ("2026-01-06", "Groceries", -82.1, "Debit"),
+    ]
+
+
+def test_reimporting_overlapping_statement_skips_duplicates(client):
+    first = "date,description,amount\n2026-02-01,Coffee,-3.00\n2026-02-01,Coffee,-3.00\n2026-02-02,Lunch,-12.00\n"
+    second = (
+        "date,description,amount\n"
+        "2026-02-01,COFFEE ,-3\n"
+        "2026-02-01,Coffee,-3.00\n"
+        "2026-02-01,Coffee,-3.00\n"
+        "2026-02-02,Lunch,-12.00\n"
+        "2026-02-03,Dinner,-25.00\n"
+    )
+    files = lambda body: {"file": ("tx.csv", body.encode("utf-8"), "text/csv")}
+    assert client.post("/api/transactions/import", files=files(first)).json() == {
+        "imported": 3,
+        "skipped": 0,
+        "duplicates": 0,
+    }
+    assert client.post("/api/transactions/import", files=files(second)).json() == {
+        "imported": 2,
+        "skipped": 0,
+        "duplicates": 3,
+    }
+    assert len(client.get("/api/transactions").json()) == 5
+
+
+def test_ordinals_spill_to_disk_past_the_memory_limit(client, monkeypatch, import_csv):
+    # The same three rows on two non-adjacent days, with room for one day in memory.
+    rows = [(f"2026-03-{day:02d}", f"Item {i}", -i) for day in (2, 5, 2, 9, 5) for i in range(3)]
+    monkeypatch.setattr(importer, "IMPORT_ORDINAL_KEYS", 3)
+    assert import_csv(rows).json() == {"imported": 15, "skipped": 0, "duplicates": 0}
+    assert import_csv(rows).json() == {"imported": 0, "skipped": 0, "duplicates": 15}
+
+    monkeypatch.setattr(importer, "IMPORT_ORDINAL_KEYS", 1000)
+    assert import_csv(rows).json() == {"imported": 0, "skipped": 0, "duplicates": 15}
+
+
+def test_overlapping_imports_skip_rows_the_other_inserted(client, db, import_csv):
+    body = "date,description,amount\n2026-04-01,Coffee,-3.00\n2026-04-02,Lunch,-12.00\n"
+    assert import_csv(body).json()["imported"] == 2
+    # A second upload of the same rows is absorbed by ON CONFLICT DO NOTHING.
+    user_id = client.get("/api/auth/me").json()["id"]
+    assert importer.import_transactions(db, user_id, io.BytesIO(body.encode("utf-8"))) == (0, 0, 2)
@@ -0,0 +1,28 @@
+import os
+
+# Budgets in milliseconds. The total includes FastAPI and SQLAlchemy, so it is
+# generous; the backend-only figure sums our own modules' self time and is the
+# one that catches a new eager import or import-time query.
+TOTAL_BUDGET_MS = float(os.environ.get("BUDGET_APP_IMPORT_BUDGET_MS", "2500"))
+BACKEND_BUDGET_MS = float(os.environ.get("BUDGET_APP_BACKEND_IMPORT_BUDGET_MS", "300"))
+LAZY_MODULES = ("authlib", "jose", "passlib", "numpy", "cryptography")
+
+
+def _import_profile(run_python):
+    result = run_python("import backend.main", "-X", "importtime")
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return modules
+
+
+def test_app_import_stays_within_budget(run_python, tmp_path):
+    modules = _import_profile(run_python)
+    assert modules["backend.main"][1] < TOTAL_BUDGET_MS
+    backend_ms = sum(self_ms for name, (self_ms, _) in modules.items() if name.startswith("backend"))
+    assert backend_ms < BACKEND_BUDGET_MS
+    assert not [name for name in modules if name.split(".")[0] in LAZY_MODULES]
+    assert not (tmp_path / "app.db").exists()
@@ -0,0 +1,59 @@
+import datetime as dt
+
+
+def _seed_state(client):
+    client.put(
+        "/api/state",
+        json={
+            "debit_balance": 2500,
+            "credit_balance": 400,
+            "cc_pay_day": 13,
+            "bills": [
+                {"name": "Rent", "amount": 1200, "frequency": "Monthly", "day": "1", "type": "Debit"},
+                {"name": "Groceries", "amount": 90, "frequency": "Weekly", "day": "Friday", "type": "Credit"},
+            ],
+            "income": [{"name": "Pay", "amount": 1800, "frequency": "Biweekly", "day": "2026-01-02"}],
+        },
+    )
+
+
+def _expand_series(encoded, days, start):
+    balances = [encoded["base"]] * (days + 1)
+    for offset, delta in zip(encoded["offsets"], encoded["deltas"]):
+        for i in range(offset, days + 1):
+            balances[i] += delta
+    return [
+        {"date": (start + dt.timedelta(days=i)).isoformat(), "balance": balance}
+        for i, balance in enumerate(balances)
+    ]
+
+
+def _expand_entries(columns, names, start):
+    return [
+        {"date": (start + dt.timedelta(days=offset)).isoformat(), "name": names[name], "amount": amount}
+        for offset, amount, name in zip(columns["offset"], columns["amount"], columns["name"])
+    ]
+
+
+def test_compact_format_round_trips_to_the_full_shape(client):
+    _seed_state(client)
+    full = client.get("/api/libraries")
+    compact = client.get("/api/libraries?format=compact")
+    data = compact.json()
+    start = dt.date.fromisoformat(data["start"])
+    assert data["days"] == 1825
+    expanded = {
+        key: _expand_entries(data[key], data["names"], start)
+        for key in ("upcoming_debit_bills", "upcoming_credit_bills", "upcoming_incomes")
+    }
+    for key in ("debit_balance_forecast", "credit_balance_forecast"):
+        expanded[key] = _expand_series(data[key], data["days"], start)
+    assert expanded == full.json()
+    assert len(compact.content) * 5 < len(full.content)
+
+
+def test_compact_format_for_user_without_forecast(client):
+    data = client.get("/api/libraries?days=30&format=compact").json()
+    assert data["debit_balance_forecast"]["offsets"] == []
+    assert client.get("/api/libraries?format=xml").status_code == 422
+    assert data["days"] == 0
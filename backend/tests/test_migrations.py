@@ -0,0 +1,142 @@
+import datetime as dt
+
+import pytest
+
+from sqlalchemy import create_engine, inspect, select, text
+
+from backend.db import connect_args
+from backend.migrations import LATEST_VERSION, current_version, run_migrations
+from backend.models import MonthlySummary, Transaction, WeeklySummary
+
+
+# The schema create_all produced at the baseline commit, before any migration existed.
+BASELINE_SCHEMA = [
+    "CREATE TABLE users (id INTEGER NOT NULL, email VARCHAR(320) NOT NULL, username VARCHAR(64), "
+    "password_hash VARCHAR(255) NOT NULL, google_sub VARCHAR(255), created_at DATETIME NOT NULL, "
+    "PRIMARY KEY (id), UNIQUE (username), UNIQUE (google_sub))",
+    "CREATE UNIQUE INDEX ix_users_email ON users (email)",
+    "CREATE INDEX ix_users_id ON users (id)",
+    "CREATE TABLE user_settings (id INTEGER NOT NULL, user_id INTEGER NOT NULL, debit_balance INTEGER NOT NULL, "
+    "credit_balance INTEGER NOT NULL, cc_pay_day INTEGER, cc_pay_method_value VARCHAR(64), "
+    "cc_pay_amount_value INTEGER, cc_pay_amount_unit_value INTEGER, cc_apr_value INTEGER, "
+    "cashflow_days INTEGER NOT NULL, cashflow_view_filter VARCHAR(16) NOT NULL, "
+    "graph_view_type VARCHAR(16) NOT NULL, graph_end_date VARCHAR(10), safe_to_spend_days INTEGER NOT NULL, "
+    "debit_floor_target INTEGER NOT NULL, PRIMARY KEY (id), UNIQUE (user_id), "
+    "FOREIGN KEY(user_id) REFERENCES users (id))",
+    "CREATE TABLE bills (id INTEGER NOT NULL, user_id INTEGER NOT NULL, name VARCHAR(255) NOT NULL, "
+    "amount INTEGER NOT NULL, frequency VARCHAR(32) NOT NULL, day VARCHAR(32) NOT NULL, "
+    "type VARCHAR(16) NOT NULL, created_at DATETIME NOT NULL, PRIMARY KEY (id), "
+    "FOREIGN KEY(user_id) REFERENCES users (id))",
+    "CREATE INDEX ix_bills_user_id ON bills (user_id)",
+    "CREATE TABLE income (id INTEGER NOT NULL, user_id INTEGER NOT NULL, name VARCHAR(255) NOT NULL, "
+    "amount INTEGER NOT NULL, frequency VARCHAR(32) NOT NULL, day VARCHAR(32) NOT NULL, "
+    "created_at DATETIME NOT NULL, PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id))",
+    "CREATE INDEX ix_income_user_id ON income (user_id)",
+    "CREATE TABLE categories (id INTEGER NOT NULL, user_id INTEGER NOT NULL, name VARCHAR(128) NOT NULL, "
+    "type VARCHAR(16) NOT NULL, PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id))",
+    "CREATE INDEX ix_categories_user_id ON categories (user_id)",
+    "CREATE TABLE accounts (id INTEGER NOT NULL, user_id INTEGER NOT NULL, name VARCHAR(255) NOT NULL, "
+    "type VARCHAR(32) NOT NULL, balance INTEGER NOT NULL, PRIMARY KEY (id), "
+    "FOREIGN KEY(user_id) REFERENCES users (id))",
+    "CREATE INDEX ix_accounts_user_id ON accounts (user_id)",
+    "CREATE TABLE alert_settings (id INTEGER NOT NULL, user_id INTEGER NOT NULL, type VARCHAR(32) NOT NULL, "
+    "threshold INTEGER NOT NULL, enabled BOOLEAN NOT NULL, PRIMARY KEY (id), "
+    "FOREIGN KEY(user_id) REFERENCES users (id))",
+    "CREATE INDEX ix_alert_settings_user_id ON alert_settings (user_id)",
+    "CREATE TABLE bill_payments (id INTEGER NOT NULL, user_id INTEGER NOT NULL, bill_name VARCHAR(255) NOT NULL, "
+    "due_date DATE NOT NULL, paid BOOLEAN NOT NULL, paid_at DATETIME, PRIMARY KEY (id), "
+    "FOREIGN KEY(user_id) REFERENCES users (id))",
+    "CREATE INDEX ix_bill_payments_user_id ON bill_payments (user_id)",
+    "CREATE TABLE weekly_summaries (id INTEGER NOT NULL, user_id INTEGER NOT NULL, week_start DATE NOT NULL, "
+    "total_income FLOAT NOT NULL, total_spend FLOAT NOT NULL, created_at DATETIME NOT NULL, PRIMARY KEY (id), "
+    "FOREIGN KEY(user_id) REFERENCES users (id))",
+    "CREATE INDEX ix_weekly_summaries_user_id ON weekly_summaries (user_id)",
+    "CREATE TABLE export_backups (id INTEGER NOT NULL, user_id INTEGER NOT NULL, payload TEXT NOT NULL, "
+    "created_at DATETIME NOT NULL, PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id))",
+    "CREATE INDEX ix_export_backups_user_id ON export_backups (user_id)",
+    "CREATE TABLE budgets (id INTEGER NOT NULL, user_id INTEGER NOT NULL, category_id INTEGER NOT NULL, "
+    "amount INTEGER NOT NULL, period VARCHAR(16) NOT NULL, PRIMARY KEY (id), "
+    "FOREIGN KEY(user_id) REFERENCES users (id), FOREIGN KEY(category_id) REFERENCES categories (id))",
+    "CREATE INDEX ix_budgets_user_id ON budgets (user_id)",
+    "CREATE TABLE transactions (id INTEGER NOT NULL, user_id INTEGER NOT NULL, date DATE NOT NULL, "
+    "name VARCHAR(255) NOT NULL, amount FLOAT NOT NULL, type VARCHAR(16) NOT NULL, category_id INTEGER, "
+    "source VARCHAR(32) NOT NULL, PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id), "
+    "FOREIGN KEY(category_id) REFERENCES categories (id))",
+    "CREATE INDEX ix_transactions_user_id ON transactions (user_id)",
+]
+
+# Databases from before username, debit_floor_target and cc_apr_value, which
+# the baseline added with ALTER TABLE at startup.
+PRE_USERNAME_SCHEMA = [
+    ddl.replace("username VARCHAR(64), ", "")
+    .replace("UNIQUE (username), ", "")
+    .replace("cc_apr_value INTEGER, ", "")
+    .replace(", debit_floor_target INTEGER NOT NULL", "")
+    for ddl in BASELINE_SCHEMA
+]
+
+
+def _engine(tmp_path, name="schema.db"):
+    return create_engine(f"sqlite:///{tmp_path / name}")
+
+
+def test_fresh_database_is_stamped_latest(tmp_path):
+    engine = _engine(tmp_path)
+    assert current_version(engine) is None
+    assert run_migrations(engine) == LATEST_VERSION
+    assert current_version(engine) == LATEST_VERSION
+    assert "fingerprint" in {col["name"] for col in inspect(engine).get_columns("transactions")}
+
+
+@pytest.mark.parametrize("schema", [BASELINE_SCHEMA, PRE_USERNAME_SCHEMA], ids=["baseline", "pre-username"])
+def test_legacy_database_is_upgraded_in_order(tmp_path, schema):
+    engine = _engine(tmp_path)
+    with engine.begin() as conn:
+        for ddl in schema:
+            conn.exec_driver_sql(ddl)
+        conn.exec_driver_sql(
+            "INSERT INTO users (id, email, password_hash, created_at) VALUES (1, 'a@b.c', 'x', '2026-01-01 00:00:00')"
+        )
+        for day in (1, 15, 29):
+            conn.exec_driver_sql(
+                "INSERT INTO transactions (user_id, date, name, amount, type, source) "
+                "VALUES (1, ?, 'Gym', -30.0, 'Debit', 'csv')",
+                (dt.date(2026, 1, day).isoformat(),),
+            )
+
+    assert run_migrations(engine) == LATEST_VERSION
+    assert "username" in {col["name"] for col in inspect(engine).get_columns("users")}
+    columns = {col["name"] for col in inspect(engine).get_columns("user_settings")}
+    assert {"debit_floor_target", "cc_apr_value", "version"} <= columns
+    indexes = {index["name"] for index in inspect(engine).get_indexes("transactions")}
+    assert {"ix_transactions_fingerprint", "ix_transactions_user_date_id"} <= indexes
+    with engine.connect() as conn:
+        assert conn.execute(select(Transaction.fingerprint).where(Transaction.fingerprint.is_(None))).all() == []
+        assert conn.execute(select(WeeklySummary.id)).all()
+        assert conn.execute(select(MonthlySummary.total_spend)).scalar() == 90.0
+        assert conn.execute(text("SELECT frequency FROM recurring_patterns")).scalar() == "Biweekly"
+
+
+def test_resumes_from_stored_version(tmp_path):
+    engine = _engine(tmp_path)
+    run_migrations(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_transactions_user_date_id")
+        conn.exec_driver_sql("UPDATE schema_version SET version = 4")
+    assert run_migrations(engine) == LATEST_VERSION
+    assert "ix_transactions_user_date_id" in {index["name"] for index in inspect(engine).get_indexes("transactions")}
+
+
+def test_current_database_costs_one_query(tmp_path, capture_sql):
+    engine = _engine(tmp_path)
+    run_migrations(engine)
+    with capture_sql(engine) as statements:
+        run_migrations(engine)
+    assert len(statements) == 1
+    assert "schema_version" in statements[0]
+
+
+def test_sqlite_connect_args_stay_on_sqlite():
+    assert connect_args("sqlite:///budget_app.db") == {"check_same_thread": False}
+    assert connect_args("postgresql://budget@db/budget") == {}
+    assert connect_args("postgresql+psycopg2://budget@db/budget") == {}
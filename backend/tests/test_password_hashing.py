@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from backend import main
+from backend.auth import PasswordHasher
+from backend.executors import BoundedExecutor
+
+METRICS_HEADERS = {"X-Metrics-Token": "metrics-secret"}
+
+
+@pytest.fixture()
+def metrics_token(monkeypatch):
+    monkeypatch.setattr("backend.auth.METRICS_TOKEN", METRICS_HEADERS["X-Metrics-Token"])
+
+
+def test_login_hashes_on_dedicated_pool(client, metrics_token):
+    before = client.get("/api/metrics/auth", headers=METRICS_HEADERS).json()["completed"]
+    payload = {"email": "hash@example.com", "username": "hash", "password": "Secret-123", "confirm_password": "Secret-123"}
+    assert client.post("/api/auth/register", json=payload).status_code == 200
+    assert client.post("/api/auth/login", json={"email": "hash@example.com", "password": "Secret-123"}).status_code == 200
+    assert client.post("/api/auth/login", json={"email": "hash@example.com", "password": "wrong"}).status_code == 401
+
+    metrics = client.get("/api/metrics/auth", headers=METRICS_HEADERS).json()
+    assert metrics["completed"] - before == 3
+    assert metrics["queue_depth"] == 0
+    assert metrics["max_ms"] > 0
+
+
+def test_metrics_require_the_configured_token(client, monkeypatch):
+    assert client.get("/api/metrics/auth").status_code == 404
+    monkeypatch.setattr("backend.auth.METRICS_TOKEN", "metrics-secret")
+    assert client.get("/api/metrics/auth").status_code == 403
+    assert client.get("/api/metrics/auth", headers={"X-Metrics-Token": "guess"}).status_code == 403
+    assert client.get("/api/metrics/auth", headers=METRICS_HEADERS).status_code == 200
+
+
+def test_auth_queries_run_off_the_event_loop(client, monkeypatch):
+    calls = []
+
+    def tracked(fn):
+        def wrapper(*args):
+            try:
+                asyncio.get_running_loop()
+                calls.append((fn.__name__, "loop"))
+            except RuntimeError:
+                calls.append((fn.__name__, "thread"))
+            return fn(*args)
+
+        wrapper.__name__ = fn.__name__
+        return wrapper
+
+    for name in ("_registration_conflict", "_create_user", "_login_record"):
+        monkeypatch.setattr(main, name, tracked(getattr(main, name)))
+    payload = {"email": "loop@example.com", "username": "loop", "password": "Secret-123", "confirm_password": "Secret-123"}
+    assert client.post("/api/auth/register", json=payload).status_code == 200
+    assert client.post("/api/auth/login", json={"email": "loop@example.com", "password": "Secret-123"}).status_code == 200
+    assert calls == [("_registration_conflict", "thread"), ("_create_user", "thread"), ("_login_record", "thread")]
+
+
+def test_hasher_rejects_past_queue_limit():
+    hasher = PasswordHasher(workers=1, queue_limit=1)
+    release = threading.Event()
+
+    async def scenario():
+        busy = asyncio.ensure_future(hasher.run(release.wait))
+        queued = asyncio.ensure_future(hasher.run(lambda: "done"))
+        await asyncio.sleep(0.05)
+        assert hasher.metrics()["queue_depth"] == 1
+        with pytest.raises(HTTPException) as exc:
+            await hasher.run(lambda: "refused")
+        release.set()
+        return exc.value.status_code, await busy, await queued
+
+    status_code, busy, queued = asyncio.run(scenario())
+    assert status_code == 503
+    assert (busy, queued) == (True, "done")
+    assert hasher.metrics()["rejected"] == 1
+
+
+def test_executor_subclasses_must_create_an_executor():
+    class Incomplete(BoundedExecutor):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(1, 1)
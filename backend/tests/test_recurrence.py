@@ -0,0 +1,51 @@
+import datetime as dt
+
+from backend.logic import occurrences_for_entry
+from backend.recurrence import compile_recurrence
+
+START = dt.date(2026, 1, 15)  # Thursday
+
+
+def test_weekly_and_biweekly_are_fixed_strides():
+    assert compile_recurrence("Weekly", "Monday").first_and_stride(START) == (4, 7)
+    assert compile_recurrence("Weekly", "someday").first_and_stride(START) == (0, 7)
+    assert compile_recurrence("Biweekly", "2026-01-02").first_and_stride(START) == (1, 14)
+    assert compile_recurrence("Biweekly", "2026-02-01").first_and_stride(START) == (17, 14)
+    assert list(compile_recurrence("Weekly", "Monday").iter_offsets(START, 20)) == [4, 11, 18]
+
+
+def test_monthly_clamps_to_the_28th_and_skips_past_days():
+    dates = list(compile_recurrence("Monthly", "31").iter_dates(START, 60))
+    assert dates == [dt.date(2026, 1, 28), dt.date(2026, 2, 28)]
+    assert list(compile_recurrence("Monthly", "3").iter_dates(START, 60)) == [
+        dt.date(2026, 2, 3),
+        dt.date(2026, 3, 3),
+    ]
+    assert list(compile_recurrence("Monthly", "0").iter_offsets(START, 365)) == []
+
+
+def test_annual_and_one_time_yield_at_most_one_date():
+    assert list(compile_recurrence("Annually", "2020-01-10").iter_dates(START, 365)) == [dt.date(2027, 1, 10)]
+    assert list(compile_recurrence("Annually", "2020-01-10").iter_dates(START, 300)) == []
+    assert list(compile_recurrence("One-time", "2026-01-20").iter_dates(START, 10)) == [dt.date(2026, 1, 20)]
+    assert list(compile_recurrence("One-time", "not a date").iter_dates(START, 10)) == []
+
+
+def test_next_dates_is_lazy_over_an_unbounded_window():
+    assert compile_recurrence("Monthly", "5").next_dates(START, 3) == [
+        dt.date(2026, 2, 5),
+        dt.date(2026, 3, 5),
+        dt.date(2026, 4, 5),
+    ]
+    assert compile_recurrence("Biweekly", "2026-01-02").next_dates(START, 2) == [
+        dt.date(2026, 1, 16),
+        dt.date(2026, 1, 30),
+    ]
+
+
+def test_offsets_array_matches_occurrences_for_entry():
+    entry = {"name": "Gym", "amount": 40, "frequency": "Weekly", "day": "Friday", "type": "Debit"}
+    occurrences = occurrences_for_entry(entry, START, 1825, is_income=False)
+    offsets = compile_recurrence("Weekly", "Friday").offsets_array(START, 1825)
+    assert [(occ[0] - START).days for occ in occurrences] == offsets.tolist()
+    assert {occ[1] for occ in occurrences} == {-40}
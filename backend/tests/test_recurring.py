@@ -0,0 +1,48 @@
+from backend.db import SessionLocal
+from backend.logic import detect_recurring
+
+
+def test_import_updates_stored_patterns_incrementally(client, import_csv):
+    import_csv(
+        [
+            ("2026-01-05", "Gym", -30),
+            ("2026-02-04", "Gym", -30),
+            ("2026-03-06", "Gym", -30),
+            ("2026-01-02", "Pay", 1800),
+            ("2026-01-16", "Pay", 1800),
+            ("2026-01-09", "Lunch", -12),
+            ("2026-01-10", "Lunch", -12),
+        ]
+    )
+    assert client.get("/api/recurring/suggest").json() == [
+        {"name": "Gym", "amount": 30, "frequency": "Monthly", "day": "2026-03-06", "type": "Debit"},
+    ]
+
+    import_csv([("2026-01-30", "Pay", 1800), ("2026-02-13", "Pay", 1800)])
+    assert client.get("/api/recurring/suggest").json() == [
+        {"name": "Gym", "amount": 30, "frequency": "Monthly", "day": "2026-03-06", "type": "Debit"},
+        {"name": "Pay", "amount": 1800, "frequency": "Biweekly", "day": "2026-02-13", "type": "Credit"},
+    ]
+
+    user_id = client.get("/api/auth/me").json()["id"]
+    with SessionLocal() as db:
+        stats = {p["name"]: (p["occurrences"], p["avg_gap"]) for p in detect_recurring(db, user_id)}
+    assert stats == {"Gym": (3, 30.0), "Pay": (4, 14.0)}
+
+
+def test_amount_keys_round_halves_to_even(client, import_csv):
+    # round(-4.5) == -4 and round(5.5) == 6, as the Python grouping always did.
+    import_csv(
+        [
+            ("2026-01-05", "Snack", -4.50),
+            ("2026-02-05", "Snack", -4.40),
+            ("2026-03-05", "Snack", -3.60),
+            ("2026-01-07", "Tip", 5.50),
+            ("2026-01-14", "Tip", 6.40),
+            ("2026-01-21", "Tip", 6.50),
+        ]
+    )
+    user_id = client.get("/api/auth/me").json()["id"]
+    with SessionLocal() as db:
+        keys = {p["name"]: (p["amount_key"], p["occurrences"]) for p in detect_recurring(db, user_id)}
+    assert keys == {"Snack": (-4, 3), "Tip": (6, 3)}
@@ -0,0 +1,84 @@
+import datetime as dt
+import gzip
+import json
+
+import pytest
+
+from backend.responses import FastJSONResponse, negotiate_encoding
+
+
+def _seed(client):
+    client.put(
+        "/api/state",
+        json={
+            "debit_balance": 1500,
+            "bills": [{"name": "Rent", "amount": 900, "frequency": "Monthly", "day": "1", "type": "Debit"}],
+            "income": [{"name": "Pay", "amount": 1200, "frequency": "Biweekly", "day": "2026-01-02"}],
+        },
+    )
+
+
+def test_negotiation_prefers_supported_encodings():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, deflate") is None
+    assert negotiate_encoding("*") in ("br", "gzip")
+    assert negotiate_encoding("") is None
+
+
+def test_fast_json_renders_dates_natively():
+    body = FastJSONResponse({"date": dt.date(2026, 3, 1), "items": [1, 2]}).body
+    assert json.loads(body) == {"date": "2026-03-01", "items": [1, 2]}
+
+
+def test_large_responses_are_gzipped_and_small_ones_are_not(client):
+    _seed(client)
+    plain = client.get("/api/libraries", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    raw = client.get("/api/libraries", headers={"Accept-Encoding": "gzip"})
+    assert raw.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in raw.headers["vary"]
+    assert int(raw.headers["content-length"]) < len(plain.content) / 5
+    assert raw.json() == plain.json()
+
+    small = client.get("/api/auth/me", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_state_keeps_etag_through_fast_response(client):
+    _seed(client)
+    res = client.get("/api/state")
+    assert res.headers["etag"] == f'"{res.json()["version"]}"'
+
+
+def test_ndjson_stream_is_compressed_incrementally(client):
+    rows = "\n".join(f"2026-01-{day:02d},Item {day},-{day}.00" for day in range(1, 29))
+    client.post("/api/transactions/import", files={"file": ("t.csv", f"date,name,amount\n{rows}\n", "text/csv")})
+    with client.stream("GET", "/api/transactions?format=ndjson", headers={"Accept-Encoding": "gzip"}) as res:
+        compressed = b"".join(res.iter_raw())
+    assert res.headers["content-encoding"] == "gzip"
+    lines = gzip.decompress(compressed).decode("utf-8").splitlines()
+    assert len(lines) == 28
+    assert json.loads(lines[0])["name"] == "Item 1"
+
+
+def test_brotli_is_preferred_when_available(client):
+    brotli = pytest.importorskip("brotli")
+    _seed(client)
+    with client.stream("GET", "/api/libraries", headers={"Accept-Encoding": "gzip, br"}) as res:
+        compressed = b"".join(res.iter_raw())
+    assert res.headers["content-encoding"] == "br"
+    assert json.loads(brotli.decompress(compressed))["debit_balance_forecast"]
+
+
+def test_compressed_bodies_get_weak_etags(client):
+    bills = [{"name": f"Bill {n}", "amount": n, "frequency": "Monthly", "day": "1", "type": "Debit"} for n in range(80)]
+    client.put("/api/state", json={"bills": bills})
+    plain = client.get("/api/state", headers={"Accept-Encoding": "identity"})
+    zipped = client.get("/api/state", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in plain.headers
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert zipped.headers["etag"] == f"W/{plain.headers['etag']}"
+    assert "Accept-Encoding" in zipped.headers["vary"]
+
+    res = client.put("/api/state", json=zipped.json(), headers={"If-Match": zipped.headers["etag"]})
+    assert res.status_code == 200
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from backend.forecast import RangeMin
+from backend.logic import build_upcoming_libraries, forecast_cache, safe_to_spend_windows
+
+
+def test_range_min_matches_brute_force():
+    rng = random.Random(7)
+    for n in (1, 2, 3, 17, 64, 1826):
+        values = [rng.randint(-5000, 5000) for _ in range(n)]
+        index = RangeMin(values)
+        for _ in range(300):
+            lo = rng.randrange(n)
+            hi = rng.randrange(lo, n)
+            assert index.query(lo, hi) == min(values[lo : hi + 1])
+    with pytest.raises(IndexError):
+        RangeMin([1, 2]).query(1, 2)
+    # Levels 1, 2, 4 and 8 wide over 8-byte values.
+    assert RangeMin(list(range(10))).nbytes == (10 + 9 + 7 + 3) * 8
+
+
+def _seed(client):
+    client.put(
+        "/api/state",
+        json={
+            "debit_balance": 2000,
+            "credit_balance": 300,
+            "cc_pay_day": 10,
+            "cc_pay_method_value": "Full",
+            "bills": [
+                {"name": "Rent", "amount": 1100, "frequency": "Monthly", "day": "3", "type": "Debit"},
+                {"name": "Phone", "amount": 60, "frequency": "Monthly", "day": "21", "type": "Credit"},
+            ],
+            "income": [{"name": "Pay", "amount": 950, "frequency": "Biweekly", "day": "2026-01-09"}],
+        },
+    )
+    return client.get("/api/auth/me").json()["id"]
+
+
+def test_batch_matches_single_window_endpoint(client, db):
+    user_id = _seed(client)
+    res = client.get("/api/safe_to_spend/batch?windows=7,14,30,90,365:400")
+    assert res.status_code == 200
+    windows = res.json()["windows"]
+    for window in windows[:4]:
+        single = client.get(f"/api/safe_to_spend?days={window['end']}").json()["safe_to_spend"]
+        assert window["safe_to_spend"] == single
+    series = [row["balance"] for row in build_upcoming_libraries(db, user_id)["debit_balance_forecast"]]
+    assert windows[4] == {"start": 365, "end": 400, "safe_to_spend": min(series[365:401])}
+
+
+def test_range_index_is_built_once_per_cached_forecast(client, db, monkeypatch):
+    user_id = _seed(client)
+    built = []
+    original = forecast_cache.derived
+
+    def counting(key, name, data, build):
+        return original(key, name, data, lambda d: built.append(name) or build(d))
+
+    monkeypatch.setattr(forecast_cache, "derived", counting)
+    safe_to_spend_windows(db, user_id, [(0, 7)])
+    safe_to_spend_windows(db, user_id, [(0, 30), (10, 90)])
+    assert built == ["debit_range_min"]
+
+
+def test_batch_rejects_bad_windows(client):
+    for windows in ("", "abc", "30:7", "2000", ",".join(["1"] * 33)):
+        assert client.get(f"/api/safe_to_spend/batch?windows={windows}").status_code in (400, 422)
+
+
+def test_single_window_rejects_out_of_range_days(client):
+    for days in (-5, 0, 1826):
+        assert client.get(f"/api/safe_to_spend?days={days}").status_code == 422
+    assert client.get("/api/safe_to_spend?days=1825").status_code == 200
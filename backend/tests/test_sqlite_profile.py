@@ -0,0 +1,52 @@
+def test_production_profile_sets_pragmas_and_read_only_pool(run_python):
+    run_python(
+        """
+        import sqlite3
+        from sqlalchemy import text
+        from backend.db import engine, read_engine
+
+        assert read_engine is not engine
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        with read_engine.connect() as conn:
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+            try:
+                conn.execute(text("CREATE TABLE nope (id INTEGER)"))
+            except Exception as exc:
+                assert "readonly" in str(exc).lower()
+            else:
+                raise AssertionError("read pool accepted a write")
+        """,
+        BUDGET_APP_SQLITE_PROFILE="production",
+    )
+
+
+def test_production_profile_serves_reads_after_writes(run_python):
+    run_python(
+        """
+        from fastapi.testclient import TestClient
+        from backend.main import app
+
+        with TestClient(app) as client:
+            first = client.get("/api/state")
+            assert first.status_code == 200
+            put = client.put("/api/state", json={"debit_balance": 250, "bills": [{"name": "Rent", "amount": 100, "frequency": "Monthly", "day": "1"}]})
+            assert put.status_code == 200
+            state = client.get("/api/state").json()
+            assert state["debit_balance"] == 250
+            assert [bill["name"] for bill in state["bills"]] == ["Rent"]
+            assert client.get("/api/libraries?days=40").json()["upcoming_debit_bills"]
+        """,
+        BUDGET_APP_SQLITE_PROFILE="production",
+    )
+
+
+def test_default_profile_shares_one_engine(run_python):
+    run_python(
+        """
+        from backend.db import engine, read_engine
+        assert read_engine is engine
+        """
+    )
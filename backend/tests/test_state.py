@@ -0,0 +1,100 @@
+import re
+
+from backend.models import Account, AlertSetting, Bill, Budget, Category, Income, User, UserSettings
+from backend.state import SETTINGS_FIELDS, load_state
+
+BILLS = [
+    {"name": "Rent", "amount": 1200, "frequency": "Monthly", "day": "1", "type": "Debit"},
+    {"name": "Gym", "amount": 30, "frequency": "Monthly", "day": "5", "type": "Debit"},
+    {"name": "Phone", "amount": 60, "frequency": "Monthly", "day": "20", "type": "Debit"},
+]
+
+
+def _writes(statements):
+    matches = (re.match(r"(INSERT|UPDATE|DELETE)(?: INTO| FROM)? (\w+)", statement) for statement in statements)
+    return [" ".join(match.groups()) for match in matches if match]
+
+
+def test_put_state_only_touches_changed_rows(client, capture_sql):
+    state = client.put("/api/state", json={"bills": BILLS}).json()
+    ids = [b["id"] for b in state["bills"]]
+
+    edited = [dict(b) for b in state["bills"] if b["name"] != "Phone"]
+    edited[1]["amount"] = 35
+    edited.append({"name": "Streaming", "amount": 15, "frequency": "Monthly", "day": "9", "type": "Debit"})
+    with capture_sql() as statements:
+        response = client.put("/api/state", json={"bills": edited})
+    writes = _writes(statements)
+
+    bills = response.json()["bills"]
+    assert [b["id"] for b in bills[:2]] == ids[:2]
+    assert [(b["name"], b["amount"]) for b in bills] == [("Rent", 1200), ("Gym", 35), ("Streaming", 15)]
+    assert sorted(writes) == [
+        "DELETE bills",
+        "INSERT bills",
+        "UPDATE bills",
+        "UPDATE user_settings",
+    ]
+
+
+def test_stale_if_match_is_rejected(client):
+    first = client.get("/api/state")
+    version = first.json()["version"]
+    assert first.headers["ETag"] == f'"{version}"'
+
+    ok = client.put("/api/state", json={"debit_balance": 10}, headers={"If-Match": f'"{version}"'})
+    assert ok.status_code == 200
+    assert ok.json()["version"] == version + 1
+
+    stale = client.put("/api/state", json={"debit_balance": 20}, headers={"If-Match": f'"{version}"'})
+    assert stale.status_code == 409
+    assert client.get("/api/state").json()["debit_balance"] == 10
+    assert client.put("/api/state", json={"debit_balance": 30}).status_code == 200
+
+
+ORM_COLLECTIONS = [
+    ("bills", Bill, ["name", "amount", "frequency", "day", "type"]),
+    ("income", Income, ["name", "amount", "frequency", "day"]),
+    ("categories", Category, ["name", "type"]),
+    ("budgets", Budget, ["category_id", "amount", "period"]),
+    ("alerts", AlertSetting, ["type", "threshold", "enabled"]),
+    ("accounts", Account, ["name", "type", "balance"]),
+]
+
+
+def _orm_state(db, user_id):
+    settings = db.query(UserSettings).filter(UserSettings.user_id == user_id).one()
+    state = {name: getattr(settings, name) for name in SETTINGS_FIELDS + ["version"]}
+    for key, model, fields in ORM_COLLECTIONS:
+        rows = db.query(model).filter(model.user_id == user_id).order_by(model.id).all()
+        state[key] = [{"id": row.id, **{name: getattr(row, name) for name in fields}} for row in rows]
+    return state
+
+
+def test_union_loader_matches_orm_loader(client, db):
+    user_id = client.get("/api/auth/me").json()["id"]
+    other = User(email="other@local", username="other", password_hash="x")
+    db.add(other)
+    db.flush()
+    for owner in (user_id, other.id):
+        db.add(UserSettings(user_id=owner, debit_balance=-40, cc_pay_day=9, cc_apr_value=None, graph_end_date="2027-01"))
+        category = Category(user_id=owner, name="Food ü", type="Expense")
+        db.add(category)
+        db.flush()
+        db.add_all(
+            [
+                Bill(user_id=owner, name="Rent", amount=1200, frequency="Monthly", day="1", type="Debit"),
+                Bill(user_id=owner, name="", amount=0, frequency="Weekly", day="Friday", type="Credit"),
+                Income(user_id=owner, name="Pay", amount=2100, frequency="Biweekly", day="2026-01-09"),
+                Budget(user_id=owner, category_id=category.id, amount=300, period="Monthly"),
+                AlertSetting(user_id=owner, type="low_balance", threshold=50, enabled=False),
+                AlertSetting(user_id=owner, type="large_bill", threshold=500, enabled=True),
+                Account(user_id=owner, name="Savings", type="Savings", balance=-5),
+            ]
+        )
+    db.commit()
+
+    state = load_state(db, user_id)
+    assert state == _orm_state(db, user_id)
+    assert all(state[key] for key, _, _ in ORM_COLLECTIONS)
+    assert [alert["enabled"] for alert in state["alerts"]] == [False, True]
@@ -0,0 +1,62 @@
+import datetime as dt
+
+from backend.db import SessionLocal, engine
+from backend.models import MonthlySummary, WeeklySummary
+from backend.summaries import apply_transaction_totals, rebuild_summaries
+
+CSV = (
+    "date,description,amount\n"
+    "2026-03-02,Paycheck,1500\n"
+    "2026-03-03,Groceries,-80.25\n"
+    "2026-03-08,Fuel,-40\n"
+    "2026-03-09,Rent,-1200\n"
+    "2026-04-01,Paycheck,1500\n"
+)
+
+
+def test_import_maintains_weekly_and_monthly_rollups(client, import_csv):
+    import_csv(CSV)
+    import_csv("date,description,amount\n2026-03-04,Refund,20\n2026-03-03,Groceries,-80.25\n")
+
+    assert client.get("/api/summary/weekly", params={"start": "2026-03-02"}).json() == {
+        "week_start": "2026-03-02",
+        "week_end": "2026-03-08",
+        "total_income": 1520.0,
+        "total_spend": 120.25,
+    }
+    # Non-Monday windows still sum the raw rows.
+    assert client.get("/api/summary/weekly", params={"start": "2026-03-03"}).json()["total_spend"] == 1320.25
+
+    monthly = client.get("/api/summary/range", params={"period": "monthly", "start": "2026-01-01", "end": "2026-12-31"})
+    assert monthly.json() == [
+        {"period_start": "2026-03-01", "total_income": 1520.0, "total_spend": 1320.25},
+        {"period_start": "2026-04-01", "total_income": 1500.0, "total_spend": 0.0},
+    ]
+    weekly = client.get("/api/summary/range", params={"start": "2026-03-01", "end": "2026-04-30"}).json()
+    assert [w["period_start"] for w in weekly] == ["2026-03-02", "2026-03-09", "2026-03-30"]
+
+
+def test_rebuild_matches_incremental_rollups(client, import_csv):
+    import_csv(CSV)
+    before = client.get("/api/summary/range", params={"start": "2026-01-01", "end": "2026-12-31"}).json()
+    with engine.begin() as conn:
+        rebuild_summaries(conn)
+    after = client.get("/api/summary/range", params={"start": "2026-01-01", "end": "2026-12-31"}).json()
+    assert after == before
+
+
+def test_rollups_upsert_without_reading_first(client, db, capture_sql):
+    user_id = client.get("/api/auth/me").json()["id"]
+    day = dt.date(2026, 3, 3)
+    with SessionLocal() as other:
+        apply_transaction_totals(other, user_id, {day: [100.0, 5.0]})
+        other.commit()
+    with capture_sql() as statements:
+        apply_transaction_totals(db, user_id, {day: [50.0, 2.5]})
+        db.commit()
+    # One INSERT ... ON CONFLICT per rollup table; no SELECT a concurrent import could race.
+    rollups = [sql for sql in statements if "summaries" in sql]
+    assert len(rollups) == 2 and all("ON CONFLICT" in sql and "SELECT" not in sql for sql in rollups)
+    weekly = db.query(WeeklySummary.total_income, WeeklySummary.total_spend, WeeklySummary.created_at).one()
+    assert weekly[:2] == (150.0, 7.5) and weekly[2] is not None
+    assert db.query(MonthlySummary.total_income).scalar() == 150.0
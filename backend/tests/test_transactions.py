@@ -0,0 +1,35 @@
+import json
+
+
+ROWS = [(f"2026-03-{day:02d}", f"Item {i}", -(day * 10 + i)) for day in (9, 2, 5, 2, 7) for i in range(3)]
+
+
+def test_keyset_pages_cover_every_row_once_in_order(client, import_csv):
+    import_csv(ROWS)
+    everything = client.get("/api/transactions").json()
+    assert [(r["date"], r["id"]) for r in everything] == sorted((r["date"], r["id"]) for r in everything)
+
+    pages = []
+    cursor = None
+    while True:
+        params = {"limit": 4, **({"after": cursor} if cursor else {})}
+        response = client.get("/api/transactions", params=params)
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert [len(p) for p in pages] == [4, 4, 4, 3]
+    assert [r for page in pages for r in page] == everything
+
+    window = client.get("/api/transactions", params={"start": "2026-03-05", "end": "2026-03-07", "limit": 5})
+    assert [r["date"] for r in window.json()] == ["2026-03-05"] * 3 + ["2026-03-07"] * 2
+    assert client.get("/api/transactions", params={"after": "garbage"}).status_code == 400
+
+
+def test_ndjson_stream_matches_json_listing(client, import_csv, monkeypatch):
+    import_csv(ROWS)
+    monkeypatch.setattr("backend.main.SessionLocal", None)
+    response = client.get("/api/transactions", params={"format": "ndjson"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+    assert streamed == client.get("/api/transactions").json()
@@ -0,0 +1,103 @@
+import datetime as dt
+import random
+
+import numpy as np
+
+from backend.forecast import _payment_amounts
+from backend.logic import _payment_amount_for_balance, compute_upcoming_libraries
+
+
+STATE = {
+    "debit_balance": 1800,
+    "credit_balance": 450,
+    "cc_pay_day": 12,
+    "cc_apr_value": 24,
+    "debit_floor_target": 500,
+    "bills": [
+        {"name": "Rent", "amount": 1000, "frequency": "Monthly", "day": "1", "type": "Debit"},
+        {"name": "Streaming", "amount": 20, "frequency": "Monthly", "day": "18", "type": "Credit"},
+    ],
+    "income": [{"name": "Pay", "amount": 1300, "frequency": "Biweekly", "day": "2026-01-09"}],
+}
+PAY_METHODS = [
+    {"cc_pay_method_value": "I want to pay my bill in full"},
+    {"cc_pay_method_value": "Custom", "cc_pay_amount_unit_value": 0, "cc_pay_amount_value": 120},
+    {"cc_pay_method_value": "I pay the minimum", "cc_pay_amount_unit_value": 1, "cc_pay_amount_value": 15},
+]
+
+
+def _items_as_bills(items):
+    bills, incomes = [], []
+    for i, item in enumerate(items):
+        entry = {"name": f"What-if {i}", "amount": item["amount"], "frequency": "Once", "day": item["date"]}
+        if item["type"] == "Income":
+            incomes.append(entry)
+        else:
+            bills.append({**entry, "type": item["type"]})
+    return bills, incomes
+
+
+def test_payment_amounts_match_scalar_rule():
+    balances = np.array([-300, -1, 0, 1, 49, 50, 333, 12345], dtype=np.int64)
+    for method in PAY_METHODS:
+        settings = type("S", (), {"cc_pay_amount_unit_value": None, "cc_pay_amount_value": None, **method})()
+        expected = [_payment_amount_for_balance(settings, int(b)) for b in balances]
+        assert _payment_amounts(settings, balances).tolist() == expected
+
+
+def test_scenarios_match_a_full_rebuild(client, db):
+    rng = random.Random(11)
+    today = dt.date.today()
+    for method in PAY_METHODS:
+        state = {**STATE, **method}
+        client.put("/api/state", json=state)
+        user_id = client.get("/api/auth/me").json()["id"]
+        scenarios = []
+        for n in range(6):
+            items = [
+                {
+                    "date": (today + dt.timedelta(days=rng.randrange(0, 200))).isoformat(),
+                    "amount": rng.choice([50, 400, 2500]),
+                    "type": rng.choice(["Debit", "Credit", "Credit", "Income"]),
+                }
+                for _ in range(rng.randrange(0, 4))
+            ]
+            scenarios.append({"name": f"s{n}", "items": items})
+        res = client.post("/api/whatif", json={"scenarios": scenarios, "days": 365})
+        assert res.status_code == 200
+        body = res.json()
+        assert body["floor"] == 500
+
+        for scenario, result in zip(scenarios, body["scenarios"]):
+            extra_bills, extra_incomes = _items_as_bills(scenario["items"])
+            client.put(
+                "/api/state",
+                json={**state, "bills": state["bills"] + extra_bills, "income": state["income"] + extra_incomes},
+            )
+            series = compute_upcoming_libraries(db, user_id, 365)["debit_balance_forecast"]
+            balances = [row["balance"] for row in series]
+            low = min(balances)
+            breach = next((row["date"] for row in series if row["balance"] < 500), None)
+            assert (result["min_balance"], result["first_breach"]) == (low, breach), scenario
+            assert result["min_date"] == series[balances.index(low)]["date"]
+            client.put("/api/state", json=state)
+
+
+def test_items_outside_the_window_are_ignored(client):
+    client.put("/api/state", json=STATE)
+    past = (dt.date.today() - dt.timedelta(days=3)).isoformat()
+    res = client.post(
+        "/api/whatif",
+        json={"days": 30, "floor": 0, "scenarios": [{"name": "late", "items": [{"date": past, "amount": 99}]}]},
+    ).json()
+    assert res["scenarios"][0]["ignored_items"] == 1
+    assert res["scenarios"][0]["min_balance"] == res["baseline"]["min_balance"]
+
+
+def test_whatif_validates_payload(client):
+    assert client.post("/api/whatif", json={"scenarios": []}).status_code == 422
+    assert client.post("/api/whatif", json={"scenarios": [{"items": []}], "days": 4000}).status_code == 422
+    item = {"date": dt.date.today().isoformat(), "amount": 10}
+    assert client.post("/api/whatif", json={"scenarios": [{"items": [dict(item, type="Loan")]}]}).status_code == 422
+    too_many = [item] * 501
+    assert client.post("/api/whatif", json={"scenarios": [{"items": too_many}]}).status_code == 422